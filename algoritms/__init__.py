@@ -1,4 +1,15 @@
-from . import landmarks
+from . import instrumentation, landmarks
+from .components import Components, condensation, strong_components, weak_components
+from .degrees import Degrees, degrees
+from .shortest_paths import (
+    bidirectional_dijkstra,
+    dijkstra,
+    shortest_distance,
+    shortest_path,
+    shortest_path_tree,
+    shortest_path_with_distance,
+)
+from .triangles import Triangles, triangles
 from .utils import *
 
 __all__ = [
@@ -7,11 +18,30 @@ __all__ = [
     "max_weak_conns_num",
     "strong_conns",
     "get_shortest_path_lengths",
+    "get_shortest_path_lengths_batch",
     "evaluate_main_characteristics",
+    "Eccentricities",
+    "bounding_eccentricities",
     "evaluate_vertices_degree",
     "num_of_triangles",
+    "Triangles",
+    "triangles",
     "average_and_global_cluster_coefficients",
     "split_graph",
+    "run_on_graphs",
     "get_proportions_after_vertices_removal",
     "landmarks",
+    "instrumentation",
+    "Components",
+    "weak_components",
+    "strong_components",
+    "condensation",
+    "Degrees",
+    "degrees",
+    "dijkstra",
+    "bidirectional_dijkstra",
+    "shortest_path_tree",
+    "shortest_distance",
+    "shortest_path",
+    "shortest_path_with_distance",
 ]
@@ -0,0 +1,31 @@
+import weakref
+from typing import Any, Callable, Hashable
+
+from models import BaseGraph
+
+_cache = weakref.WeakKeyDictionary()
+
+
+def cached(graph: BaseGraph, name: Hashable, compute: Callable[[BaseGraph], Any]) -> Any:
+    """
+    Результат compute(graph), сохранённый до изменения графа
+
+    Результат привязан к graph.version, поэтому повторный вызов для неизменённого
+    графа стоит O(1), а любое изменение через методы графа делает его устаревшим.
+    Все вызывающие получают один и тот же объект: compute должна возвращать
+    неизменяемые значения или значения, которые вызывающие не изменяют.
+    """
+    entries = _cache.setdefault(graph, {})
+    version = graph.version
+    entry = entries.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    value = compute(graph)
+    entries[name] = (version, value)
+    return value
+
+
+def clear() -> None:
+    """Сбросить все сохранённые результаты"""
+    _cache.clear()
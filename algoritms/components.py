@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+from typing import FrozenSet, List, Mapping, Tuple
+
+from algoritms.cache import cached
+from algoritms.instrumentation import count_scanned, instrumented
+from models import BaseGraph
+
+
+class DisjointSet:
+    """Система непересекающихся множеств со сжатием путей и объединением по рангу"""
+
+    __slots__ = ("parent", "rank", "size")
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.rank = [0] * n
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> int:
+        """Объединить множества a и b, вернуть корень объединения"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+
+        rank = self.rank
+        if rank[a] < rank[b]:
+            a, b = b, a
+        elif rank[a] == rank[b]:
+            rank[a] += 1
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+@dataclass(frozen=True)
+class Components:
+    """
+    Разбиение вершин графа на компоненты
+
+    Результат хранится в кеше и разделяется всеми вызовами для неизменённого графа,
+    поэтому sizes и members неизменяемы, а labels нельзя изменять.
+
+    :param labels: Номер компоненты для каждой вершины
+    :param sizes: Размеры компонент
+    :param members: Множества вершин компонент
+    """
+
+    labels: Mapping[int, int]
+    sizes: Tuple[int, ...]
+    members: Tuple[FrozenSet[int], ...]
+
+
+@instrumented()
+def weak_components(graph: BaseGraph) -> Components:
+    """Компоненты слабой связности, вычисленные один раз для неизменённого графа"""
+    return cached(graph, "weak_components", _weak_components)
+
+
+def _weak_components(graph: BaseGraph) -> Components:
+    vertices = list(graph.get_all_vertices())
+    index = {v: i for i, v in enumerate(vertices)}
+    dsu = DisjointSet(len(vertices))
+
+    for i, v in enumerate(vertices):
+        for u in graph.neighbors[v]:
+            dsu.union(i, index[u])
+    count_scanned(graph, vertices)
+
+    labels = {}
+    sizes = []
+    members = []
+    comp_of_root = {}
+    for i, v in enumerate(vertices):
+        root = dsu.find(i)
+        comp = comp_of_root.get(root)
+        if comp is None:
+            comp = comp_of_root[root] = len(sizes)
+            sizes.append(dsu.size[root])
+            members.append([])
+        labels[v] = comp
+        members[comp].append(v)
+
+    return Components(labels, tuple(sizes), tuple(map(frozenset, members)))
+
+
+@instrumented()
+def strong_components(graph: BaseGraph) -> Components:
+    """
+    Компоненты сильной связности (итеративный алгоритм Тарьяна)
+
+    Компоненты пронумерованы в топологическом порядке графа конденсации:
+    рёбра между компонентами ведут от меньшего номера к большему.
+    """
+    return cached(graph, "strong_components", _strong_components)
+
+
+def _strong_components(graph: BaseGraph) -> Components:
+    vertices = list(graph.get_all_vertices())
+    index = {v: i for i, v in enumerate(vertices)}
+    outgoing = graph.outgoing_adj_list
+    n = len(vertices)
+
+    def successors(i: int) -> List[int]:
+        v = vertices[i]
+        if v not in outgoing:
+            return []
+        return [index[e.end] for e in outgoing[v] if e.end in index]
+
+    order = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    adj = [None] * n
+    cursor = [0] * n
+    stack = []
+    emitted = []
+    counter = 0
+
+    for root in range(n):
+        if order[root] != -1:
+            continue
+
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        adj[root] = successors(root)
+        call = [root]
+
+        while call:
+            v = call[-1]
+            edges = adj[v]
+            i = cursor[v]
+            while i < len(edges):
+                w = edges[i]
+                i += 1
+                if order[w] == -1:
+                    cursor[v] = i
+                    order[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    adj[w] = successors(w)
+                    call.append(w)
+                    break
+                if on_stack[w] and order[w] < low[v]:
+                    low[v] = order[w]
+            else:
+                call.pop()
+                adj[v] = None
+                if call and low[v] < low[call[-1]]:
+                    low[call[-1]] = low[v]
+                if low[v] == order[v]:
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        comp.append(vertices[w])
+                        if w == v:
+                            break
+                    emitted.append(frozenset(comp))
+
+    count_scanned(graph, vertices)
+    # Tarjan emits components in reverse topological order
+    members = tuple(reversed(emitted))
+    labels = {v: comp for comp, vs in enumerate(members) for v in vs}
+    return Components(labels, tuple(map(len, members)), members)
+
+
+@instrumented()
+def condensation(graph: BaseGraph) -> Tuple[FrozenSet[int], ...]:
+    """
+    Граф конденсации: для каждой компоненты сильной связности множество компонент,
+    в которые из неё ведут рёбра. Номера компонент совпадают с strong_components.
+    """
+    return cached(graph, "condensation", _condensation)
+
+
+def _condensation(graph: BaseGraph) -> Tuple[FrozenSet[int], ...]:
+    components = strong_components(graph)
+    labels = components.labels
+    outgoing = graph.outgoing_adj_list
+    dag = [set() for _ in components.sizes]
+    for v, comp in labels.items():
+        if v not in outgoing:
+            continue
+        for edge in outgoing[v]:
+            end_comp = labels.get(edge.end)
+            if end_comp is not None and end_comp != comp:
+                dag[comp].add(end_comp)
+    return tuple(map(frozenset, dag))
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from algoritms.cache import cached
+from models import BaseGraph
+
+
+@dataclass(frozen=True)
+class Degrees:
+    """
+    Степени вершин графа (число элементов neighbors)
+
+    :param vertices: Вершины графа
+    :param degrees: Степени вершин в том же порядке, массив только для чтения
+    :param by_degree: Вершины по убыванию степени, равные степени - в порядке vertices
+    """
+
+    vertices: Tuple[int, ...]
+    degrees: np.ndarray
+    by_degree: Tuple[int, ...]
+
+
+def degrees(graph: BaseGraph) -> Degrees:
+    """Таблица степеней, вычисленная один раз для неизменённого графа"""
+    return cached(graph, "degrees", _degrees)
+
+
+def _degrees(graph: BaseGraph) -> Degrees:
+    vertices = tuple(graph.get_all_vertices())
+    neighbors = graph.neighbors
+    table = np.fromiter(
+        (len(neighbors[v]) for v in vertices), dtype=np.int64, count=len(vertices)
+    )
+    table.flags.writeable = False
+    order = np.argsort(-table, kind="stable")
+    return Degrees(vertices, table, tuple(vertices[i] for i in order.tolist()))
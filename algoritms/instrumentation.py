@@ -0,0 +1,208 @@
+import csv
+import functools
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Callable, Collection, Dict, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# called with every finished record; instrumentation is off while the list is empty
+_listeners: List[Callable[["CallRecord"], None]] = []
+# records of the instrumented calls in progress, innermost last
+_stack: List["CallRecord"] = []
+
+
+@dataclass
+class CallRecord:
+    """
+    Замер одного вызова инструментированной функции
+
+    Счётчики включают вложенные инструментированные вызовы, размеры фронтов
+    записываются только для уровней обходов самой функции.
+
+    :param name: Название функции
+    :param depth: Глубина вложенности вызова, 0 - вызов верхнего уровня
+    :param seconds: Время выполнения
+    :param vertices_visited: Число посещённых (обработанных) вершин
+    :param edges_scanned: Число просмотренных элементов списков смежности
+    :param frontier_sizes: Размеры фронтов по уровням обходов в ширину
+    :param peak_memory: Пик выделенной во время вызова памяти в байтах, None - память
+        не отслеживалась
+    :param params: Дополнительные сведения о вызове
+    """
+
+    name: str
+    depth: int = 0
+    seconds: float = 0.0
+    vertices_visited: int = 0
+    edges_scanned: int = 0
+    frontier_sizes: List[int] = field(default_factory=list)
+    peak_memory: Optional[int] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    # clock and traced memory when the call started
+    _start: float = field(default=0.0, repr=False, compare=False)
+    _memory_base: int = field(default=0, repr=False, compare=False)
+    _memory_peak: int = field(default=0, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+
+
+def add_listener(callback: Callable[[CallRecord], None]) -> None:
+    """Вызывать callback для каждого завершённого инструментированного вызова"""
+    _listeners.append(callback)
+
+
+def remove_listener(callback: Callable[[CallRecord], None]) -> None:
+    _listeners.remove(callback)
+
+
+def enabled() -> bool:
+    return bool(_listeners)
+
+
+def current() -> Optional[CallRecord]:
+    """Замер выполняющегося инструментированного вызова, None - замеры выключены"""
+    return _stack[-1] if _stack else None
+
+
+def count_scanned(graph: Any, vertices: Collection[int]) -> None:
+    """Учесть в текущем замере обработку vertices с просмотром их списков смежности"""
+    record = current()
+    if record is not None:
+        record.vertices_visited += len(vertices)
+        neighbors = graph.neighbors
+        record.edges_scanned += sum(len(neighbors[v]) for v in vertices)
+
+
+def _begin(name: str) -> CallRecord:
+    record = CallRecord(name, depth=len(_stack))
+    if tracemalloc.is_tracing():
+        # reset_peak drops the peaks of the enclosing calls, save them first
+        size, peak = tracemalloc.get_traced_memory()
+        for outer in _stack:
+            outer._memory_peak = max(outer._memory_peak, peak - outer._memory_base)
+        # reset_peak appeared in Python 3.9, before that the peak of a nested call is
+        # an upper bound that may include earlier peaks of the enclosing calls
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        record._memory_base = size
+    _stack.append(record)
+    record._start = time.perf_counter()
+    return record
+
+
+def _end(record: CallRecord) -> None:
+    record.seconds = time.perf_counter() - record._start
+    if tracemalloc.is_tracing():
+        _, peak = tracemalloc.get_traced_memory()
+        record.peak_memory = max(record._memory_peak, peak - record._memory_base)
+    _stack.pop()
+    if _stack:
+        outer = _stack[-1]
+        outer.vertices_visited += record.vertices_visited
+        outer.edges_scanned += record.edges_scanned
+    emit(record)
+
+
+def emit(record: CallRecord) -> None:
+    """Передать готовый замер всем слушателям"""
+    for callback in list(_listeners):
+        callback(record)
+
+
+def instrumented(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Декоратор, замеряющий вызовы функции
+
+    Пока нет ни одного слушателя, обёртка только проверяет пустоту списка слушателей
+    и вызывает функцию. Вызовы в дочерних процессах parallel_map не замеряются.
+    """
+
+    def decorator(func: F) -> F:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _listeners:
+                return func(*args, **kwargs)
+            record = _begin(label)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _end(record)
+
+        return wrapper
+
+    return decorator
+
+
+class Profiler:
+    """
+    Контекстный менеджер, собирающий замеры всех инструментированных вызовов
+
+    with Profiler(memory=True) as profiler:
+        evaluate_main_characteristics(graph, component)
+    profiler.to_csv("profile.csv")
+
+    :param memory: Отслеживать пик памяти через tracemalloc, что заметно замедляет
+        выполнение. До Python 3.9 пик вложенного вызова - оценка сверху: в него может
+        войти более ранний пик объемлющего вызова
+    """
+
+    def __init__(self, memory: bool = False):
+        self.records: List[CallRecord] = []
+        self._memory = memory
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        if self._memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        add_listener(self.records.append)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        remove_listener(self.records.append)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Суммы по функциям: число вызовов, время и счётчики вызовов верхнего уровня"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for record in self.records:
+            if record.depth:
+                continue
+            total = totals.setdefault(
+                record.name,
+                {"calls": 0, "seconds": 0.0, "vertices_visited": 0, "edges_scanned": 0},
+            )
+            total["calls"] += 1
+            total["seconds"] += record.seconds
+            total["vertices_visited"] += record.vertices_visited
+            total["edges_scanned"] += record.edges_scanned
+        return totals
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Замеры в JSON; при заданном path они также записываются в файл"""
+        text = json.dumps([record.to_dict() for record in self.records], indent=2)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+    def to_csv(self, path: str) -> None:
+        """Замеры в CSV, размеры фронтов через пробел, params - JSON-строкой"""
+        columns = [f.name for f in fields(CallRecord) if not f.name.startswith("_")]
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            for record in self.records:
+                row = record.to_dict()
+                row["frontier_sizes"] = " ".join(map(str, record.frontier_sizes))
+                row["params"] = json.dumps(record.params)
+                writer.writerow(row)
@@ -1,10 +1,13 @@
 from .utils import SelectLandmarksMethod, select_landmarks
-from .basic import LandmarksBasic
+from .basic import ExactDistance, LandmarksBasic
 from .lca import LandmarksLCA
+from .pll import PrunedLandmarkLabeling
 
 __all__ = [
     "SelectLandmarksMethod",
     "select_landmarks",
+    "ExactDistance",
     "LandmarksBasic",
     "LandmarksLCA",
+    "PrunedLandmarkLabeling",
 ]
@@ -1,34 +1,537 @@
-from typing import Optional
+import math
+from dataclasses import dataclass
+from heapq import heapify, heappop, heappush
+from typing import Callable, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
-from algoritms.landmarks.utils import SelectLandmarksMethod, select_landmarks
+import numpy as np
+
+from algoritms.cache import cached
+from algoritms.instrumentation import current, instrumented
+from algoritms.landmarks.storage import graph_fingerprint, read_index, write_index
+from algoritms.landmarks.utils import (
+    BEST_COVERAGE_PATHS,
+    SelectLandmarksMethod,
+    select_landmarks,
+)
+from algoritms.parallel import parallel_map, split
+from algoritms.shortest_paths import _weighted_adjacency
+from algoritms.utils import (
+    _distance_dtype,
+    _unreachable,
+    get_shortest_path_lengths_batch,
+)
 from models import BaseGraph
 
 
+@dataclass(frozen=True)
+class ExactDistance:
+    """
+    Результат точного запроса расстояния
+
+    :param distance: Расстояние, inf для недостижимой вершины
+    :param settled: Число вершин, обработанных поиском
+    """
+
+    distance: Union[int, float]
+    settled: int
+
+
+PAIRS_CHUNK = 1 << 16
+
+
+def _landmark_distances(
+    shared: Tuple[BaseGraph, List[int]], landmarks: List[int]
+) -> np.ndarray:
+    graph, vertices = shared
+    return get_shortest_path_lengths_batch(
+        graph, landmarks, vertices, dtype=_distance_dtype(graph)
+    )
+
+
+def _lower_bounds(to_start: np.ndarray, to_end: np.ndarray) -> np.ndarray:
+    """
+    Нижние оценки max_L |d(s, L) - d(t, L)| по столбцам расстояний до ориентиров
+
+    Если ориентир достигает ровно одну из двух вершин, они в разных компонентах
+    и оценка равна inf; ориентиры, не достигающие ни одной, не учитываются.
+    """
+    with np.errstate(invalid="ignore"):
+        diff = np.abs(to_start - to_end)
+    diff[np.isnan(diff)] = 0
+    return diff.max(axis=0, initial=0)
+
+
 class LandmarksBasic:
+    # attributes with the prepared tables, saved by save()
+    _ARRAYS = ("_distances",)
+
     def __init__(
         self,
         graph: BaseGraph,
         count_landmarks: int,
         select_landmarks_method: Optional[SelectLandmarksMethod] = None,
+        workers: int = 1,
+        paths_count: int = BEST_COVERAGE_PATHS,
     ):
         self._landmarks = select_landmarks(
-            graph, count_landmarks, select_landmarks_method
+            graph, count_landmarks, select_landmarks_method, paths_count
         )
-        self._distances = {}
+        self._workers = workers
+        self._graph = graph
+        # oracles of one class with the same landmarks share the tables while the
+        # graph is unchanged; shared tables are read-only and copied on update
+        vertices, tables = cached(
+            graph, (type(self).__name__, tuple(self._landmarks)), self._build_tables
+        )
+        self._vertices = list(vertices)
+        self._index = {v: i for i, v in enumerate(self._vertices)}
+        for name, table in zip(self._ARRAYS, tables):
+            setattr(self, name, table)
+
+    @instrumented("landmarks.prepare")
+    def _build_tables(
+        self, graph: BaseGraph
+    ) -> Tuple[Tuple[int, ...], Tuple[np.ndarray, ...]]:
+        record = current()
+        if record is not None:
+            record.params.update(
+                oracle=type(self).__name__, landmarks=len(self._landmarks)
+            )
+        self._vertices = list(graph.get_all_vertices())
+        self._index = {v: i for i, v in enumerate(self._vertices)}
         self._prepare(graph)
+        tables = tuple(getattr(self, name) for name in self._ARRAYS)
+        for table in tables:
+            table.flags.writeable = False
+        return tuple(self._vertices), tables
 
     def _prepare(self, graph: BaseGraph) -> None:
-        for landmark in self._landmarks:
-            self._distances[landmark] = get_shortest_path_lengths(
-                graph, landmark, graph.get_all_vertices()
+        # landmarks x vertices, unreachable pairs hold the dtype maximum
+        self._distances = np.concatenate(
+            parallel_map(
+                _landmark_distances,
+                (graph, self._vertices),
+                split(self._landmarks, self._workers),
+                self._workers,
             )
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Сохранить подготовленные таблицы в файл
+
+        Вместе с таблицами сохраняется отпечаток графа, по которому load проверяет,
+        что индекс загружается для того же графа.
+        """
+        arrays = {
+            "vertices": np.asarray(self._vertices, dtype=np.int64),
+            "landmarks": np.asarray(self._landmarks, dtype=np.int64),
+        }
+        # tables may have spare columns reserved for new vertices
+        for name in self._ARRAYS:
+            arrays[name.lstrip("_")] = getattr(self, name)[..., : len(self._vertices)]
+        header = {"class": type(self).__name__, "graph": graph_fingerprint(self._graph)}
+        write_index(path, header, arrays)
+
+    @classmethod
+    def load(cls, path: str, graph: BaseGraph, workers: int = 1) -> "LandmarksBasic":
+        """
+        Загрузить индекс, сохранённый save, без повторных обходов графа
+
+        Таблицы отображаются в память только для чтения, поэтому загрузка почти
+        мгновенна, а несколько процессов разделяют страницы одного файла.
+        """
+        header, arrays = read_index(path)
+        if header["class"] != cls.__name__:
+            raise ValueError(f"{path} holds {header['class']}, not {cls.__name__}")
+        if header["graph"] != graph_fingerprint(graph):
+            raise ValueError(f"{path} was built for a different graph")
+
+        oracle = cls.__new__(cls)
+        oracle._landmarks = arrays["landmarks"].tolist()
+        oracle._workers = workers
+        oracle._graph = graph
+        oracle._vertices = arrays["vertices"].tolist()
+        oracle._index = {v: i for i, v in enumerate(oracle._vertices)}
+        for name in cls._ARRAYS:
+            setattr(oracle, name, arrays[name.lstrip("_")])
+        return oracle
+
+    def _columns(self, vertices: Iterable[int]) -> np.ndarray:
+        index = self._index
+        return np.fromiter((index[v] for v in vertices), dtype=np.intp)
+
+    def _to_landmarks(self, columns: np.ndarray) -> np.ndarray:
+        """Расстояния от ориентиров до вершин столбцов columns, inf - недостижимо"""
+        distances = self._distances[:, columns].astype(np.float64)
+        distances[distances == _unreachable(self._distances.dtype)] = np.inf
+        return distances
+
+    def distance(self, start: int, end: int) -> Union[int, float]:
+        upper = self.distance_many([(start, end)])[0][0]
+        if upper == np.inf:
+            return math.inf
+        # distance_many works in float64, integer tables hold integer distances
+        if np.issubdtype(self._distances.dtype, np.integer):
+            return int(upper)
+        return upper.item()
+
+    @instrumented("landmarks.distance_many")
+    def distance_many(
+        self, pairs: Union[Sequence[Tuple[int, int]], np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Верхние и нижние оценки расстояний для набора пар вершин
+
+        Оценки считаются векторно по матрице расстояний до ориентиров.
+
+        :param pairs: Пары (start, end) или массив формы (k, 2)
+        :return: Массивы верхних и нижних оценок длины k; inf в верхней оценке -
+            ни один ориентир не связывает пару, в нижней - вершины недостижимы
+        """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        upper = np.empty(len(pairs))
+        lower = np.empty(len(pairs))
+        for begin in range(0, len(pairs), PAIRS_CHUNK):
+            chunk = pairs[begin : begin + PAIRS_CHUNK]
+            starts = self._columns(chunk[:, 0].tolist())
+            ends = self._columns(chunk[:, 1].tolist())
+            to_start = self._to_landmarks(starts)
+            to_end = self._to_landmarks(ends)
+            upper[begin : begin + len(chunk)] = self._upper_bounds(
+                starts, ends, to_start, to_end
+            )
+            lower[begin : begin + len(chunk)] = _lower_bounds(to_start, to_end)
+        return upper, lower
+
+    def _upper_bounds(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        to_start: np.ndarray,
+        to_end: np.ndarray,
+    ) -> np.ndarray:
+        return (to_start + to_end).min(axis=0, initial=np.inf)
+
+    def add_edge(self, _from: int, _to: int, weight: int = 1) -> None:
+        """
+        Добавить ребро в граф и обновить таблицы ориентиров
+
+        Уменьшившиеся расстояния распространяются от концов ребра алгоритмом
+        Дейкстры, остальные элементы таблиц не пересчитываются.
+
+        :param weight: Вес ребра, учитывается только для взвешенного графа. Если ребро
+            уже есть в графе, ни граф, ни таблицы не меняются
+        """
+        if self._graph.has_edge(_from, _to):
+            return
+        if self._graph.is_weighted():
+            self._graph.add_edge(_from, _to, weight)
+        else:
+            self._graph.add_edge(_from, _to)
+            weight = 1
+
+        self._make_writable()
+        a, b = self._add_vertex(_from), self._add_vertex(_to)
+        adjacent = _weighted_adjacency(self._graph)
+        for row in range(len(self._landmarks)):
+            heap = []
+            for x, y in ((a, b), (b, a)):
+                to_x = self._distance(row, x)
+                if to_x + weight < self._distance(row, y):
+                    heap.append((to_x + weight, y, x))
+            self._relax(row, heap, adjacent)
+        self._tables_changed()
+
+    def delete_edge(self, _from: int, _to: int) -> None:
+        """
+        Удалить ребро из графа и обновить таблицы ориентиров
+
+        Пересчитываются только вершины, у которых после удаления не осталось
+        кратчайшего пути до ориентира через незатронутых соседей.
+        """
+        self._graph.delete_edge(_from, _to)
 
-    def distance(self, start: int, end: int) -> int:
-        upper_bounder = float("inf")
-        for landmark in self._landmarks:
-            landmark_distance = self._distances[landmark]
-            upper_bounder = min(
-                upper_bounder, landmark_distance[start] + landmark_distance[end]
+        self._make_writable()
+        endpoints = (self._index[_from], self._index[_to])
+        adjacent = _weighted_adjacency(self._graph)
+        for row, landmark in enumerate(self._landmarks):
+            affected = self._affected_by_deletion(
+                row, self._index[landmark], endpoints, adjacent
             )
+            if affected:
+                self._resettle(row, affected, adjacent)
+        self._tables_changed()
+
+    def _tables_changed(self) -> None:
+        """Вызывается после обновления таблиц расстояний"""
+
+    def _parent_row(self, row: int) -> Optional[np.ndarray]:
+        """Предки вершин в дереве кратчайших путей ориентира, если оно хранится"""
+        return None
+
+    def _make_writable(self) -> None:
+        # tables loaded from disk are read-only memory maps
+        for name in self._ARRAYS:
+            array = getattr(self, name)
+            if isinstance(array, np.memmap) or not array.flags.writeable:
+                setattr(self, name, np.array(array))
+
+    def _add_vertex(self, v: int) -> int:
+        """Столбец вершины v, новой вершине выделяется столбец с удвоением запаса"""
+        col = self._index.get(v)
+        if col is None:
+            col = len(self._vertices)
+            if col == self._distances.shape[1]:
+                self._grow(max(1, 2 * col))
+            self._vertices.append(v)
+            self._index[v] = col
+        return col
+
+    def _grow(self, capacity: int) -> None:
+        old = self._distances
+        self._distances = np.full(
+            (len(old), capacity), _unreachable(old.dtype), dtype=old.dtype
+        )
+        self._distances[:, : old.shape[1]] = old
+
+    def _distance(self, row: int, col: int) -> Union[int, float]:
+        d = self._distances[row, col]
+        return math.inf if d == _unreachable(self._distances.dtype) else d.item()
+
+    def _relax(
+        self,
+        row: int,
+        heap: List[Tuple[int, int, int]],
+        adjacent: Callable[[int], Iterable[Tuple[int, int]]],
+    ) -> None:
+        """
+        Алгоритм Дейкстры, обновляющий только уменьшающиеся расстояния
+
+        :param heap: Кандидаты (расстояние, столбец вершины, столбец предка)
+        """
+        distances, parents = self._distances[row], self._parent_row(row)
+        unreachable = _unreachable(distances.dtype)
+        index, vertices = self._index, self._vertices
+        heapify(heap)
+        while heap:
+            d, col, parent = heappop(heap)
+            if d >= self._distance(row, col):
+                continue
+            if d >= unreachable:
+                raise OverflowError(f"distance {d} does not fit {distances.dtype}")
+            distances[col] = d
+            if parents is not None:
+                parents[col] = parent
+            for u, w in adjacent(vertices[col]):
+                u_col = index[u]
+                if d + w < self._distance(row, u_col):
+                    heappush(heap, (d + w, u_col, col))
+
+    def _affected_by_deletion(
+        self,
+        row: int,
+        root: int,
+        endpoints: Tuple[int, int],
+        adjacent: Callable[[int], Iterable[Tuple[int, int]]],
+    ) -> Set[int]:
+        """
+        Вершины, расстояние до которых могло увеличиться после удаления ребра
+
+        Вершина не затронута, если у неё остался сосед u вне множества затронутых
+        с d(u) + w(u, v) = d(v). Проверка идёт от концов ребра по возрастанию
+        расстояния вдоль таких рёбер. Ещё не проверенный сосед, а через ребро нулевого
+        веса и любой непроверенный сосед опорой не считается, поэтому множество может
+        оказаться больше, но не меньше нужного. Незатронутым
+        вершинам, проверенным по пути, предком назначается найденная опора.
+        """
+        index, vertices = self._index, self._vertices
+        parents = self._parent_row(row)
+        heap = []
+        for col in set(endpoints):
+            d = self._distance(row, col)
+            if d != math.inf:
+                heap.append((d, col))
+        heapify(heap)
+        queued = {col for _, col in heap}
+        processed = set()
+        affected = set()
+        while heap:
+            d, col = heappop(heap)
+            processed.add(col)
+            if col == root:
+                continue
+
+            adjacency = [(index[u], w) for u, w in adjacent(vertices[col])]
+            support = next(
+                (
+                    u_col
+                    for u_col, w in adjacency
+                    if u_col != col
+                    and u_col not in affected
+                    and (u_col in processed or (w and u_col not in queued))
+                    and self._distance(row, u_col) + w == d
+                ),
+                None,
+            )
+            if support is not None:
+                # the old parent may be gone or affected
+                if parents is not None:
+                    parents[col] = support
+                continue
+
+            affected.add(col)
+            for u_col, w in adjacency:
+                if u_col not in queued and self._distance(row, u_col) == d + w:
+                    queued.add(u_col)
+                    heappush(heap, (d + w, u_col))
+        return affected
+
+    def _resettle(
+        self,
+        row: int,
+        affected: Set[int],
+        adjacent: Callable[[int], Iterable[Tuple[int, int]]],
+    ) -> None:
+        """Заново найти расстояния до затронутых вершин от их незатронутых соседей"""
+        index, vertices = self._index, self._vertices
+        distances, parents = self._distances[row], self._parent_row(row)
+        for col in affected:
+            distances[col] = _unreachable(distances.dtype)
+            if parents is not None:
+                parents[col] = col
+
+        heap = []
+        for col in affected:
+            for u, w in adjacent(vertices[col]):
+                u_col = index[u]
+                if u_col not in affected:
+                    d = self._distance(row, u_col)
+                    if d != math.inf:
+                        heap.append((d + w, col, u_col))
+        self._relax(row, heap, adjacent)
+
+    def _lower_bound_to(self, target: int) -> Callable[[int], float]:
+        """
+        Нижняя оценка расстояния до target по неравенству треугольника
+
+        d(v, target) >= |d(v, L) - d(target, L)| для каждой вершины-ориентира L. Если
+        ориентир достигает ровно одну из двух вершин, они в разных компонентах.
+        """
+        distances = self._distances
+        unreachable = _unreachable(distances.dtype)
+        index = self._index
+        # the search calls the bound for every vertex it reaches, keep it in Python
+        to_target = distances[:, index[target]].tolist()
+        bounds = {}
+
+        def bound(v: int) -> float:
+            h = bounds.get(v)
+            if h is not None:
+                return h
+            h = 0
+            for to_v, to_t in zip(distances[:, index[v]].tolist(), to_target):
+                if to_v == to_t:
+                    continue
+                if to_v == unreachable or to_t == unreachable:
+                    h = math.inf
+                    break
+                diff = abs(to_v - to_t)
+                if diff > h:
+                    h = diff
+            bounds[v] = h
+            return h
+
+        return bound
+
+    @instrumented("landmarks.exact_distance")
+    def exact_distance(
+        self, start: int, end: int, bidirectional: bool = True
+    ) -> ExactDistance:
+        """
+        Точное расстояние поиском A* с нижними оценками по вершинам-ориентирам (ALT)
+
+        :param bidirectional: Вести поиск с обоих концов со средними потенциалами
+        :return: Расстояние и число обработанных поиском вершин
+        """
+        if start == end:
+            return ExactDistance(0, 0)
+        if bidirectional:
+            result = self._bidirectional_alt(start, end)
+        else:
+            result = self._alt(start, end)
+        record = current()
+        if record is not None:
+            record.vertices_visited += result.settled
+        return result
+
+    def _alt(self, start: int, end: int) -> ExactDistance:
+        adjacent = _weighted_adjacency(self._graph)
+        to_end = self._lower_bound_to(end)
+        if to_end(start) == math.inf:
+            return ExactDistance(math.inf, 0)
+
+        tentative = {start: 0}
+        settled = set()
+        heap = [(to_end(start), 0, start)]
+        while heap:
+            _, d, v = heappop(heap)
+            if v in settled:
+                continue
+            settled.add(v)
+            # the landmark bound is consistent, so a settled vertex is final
+            if v == end:
+                return ExactDistance(d, len(settled))
+
+            for u, w in adjacent(v):
+                du = d + w
+                if du < tentative.get(u, math.inf):
+                    tentative[u] = du
+                    h = to_end(u)
+                    if h != math.inf:
+                        heappush(heap, (du + h, du, u))
+
+        return ExactDistance(math.inf, len(settled))
+
+    def _bidirectional_alt(self, start: int, end: int) -> ExactDistance:
+        adjacent = _weighted_adjacency(self._graph)
+        to_end = self._lower_bound_to(end)
+        to_start = self._lower_bound_to(start)
+        if to_end(start) == math.inf:
+            return ExactDistance(math.inf, 0)
+
+        def potential(v: int) -> float:
+            # average potential of the forward search, the backward one is its negation
+            return (to_end(v) - to_start(v)) / 2
+
+        sign = (1, -1)
+        tentative = ({start: 0}, {end: 0})
+        settled = (set(), set())
+        heaps = (
+            [(potential(start), 0, start)],
+            [(-potential(end), 0, end)],
+        )
+
+        best = math.inf
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, d, v = heappop(heaps[side])
+            if v in settled[side]:
+                continue
+            settled[side].add(v)
+
+            dist, other = tentative[side], tentative[1 - side]
+            for u, w in adjacent(v):
+                du = d + w
+                if du < dist.get(u, math.inf):
+                    dist[u] = du
+                    # vertices off every start-end path have an infinite bound
+                    if to_end(u) != math.inf and to_start(u) != math.inf:
+                        heappush(heaps[side], (du + sign[side] * potential(u), du, u))
+                if u in other and dist[u] + other[u] < best:
+                    best = dist[u] + other[u]
 
-        return upper_bounder
+        return ExactDistance(best, len(settled[0]) + len(settled[1]))
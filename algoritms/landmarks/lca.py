@@ -1,41 +1,156 @@
 from typing import List, Dict, Set
 
+import numpy as np
+
 from algoritms.landmarks.basic import LandmarksBasic
-from algoritms.landmarks.utils import get_lca_tree
+from algoritms.parallel import parallel_map
+from algoritms.shortest_paths import shortest_path_tree
+from algoritms.utils import _distance_dtype, _unreachable
 from models import BaseGraph
 
 
 class LandmarksLCA(LandmarksBasic):
+    _ARRAYS = ("_distances", "_levels", "_ancestors")
+    # the lifting table lags behind the parents after add_edge/delete_edge
+    _stale = False
+
     def _prepare(self, graph: BaseGraph) -> None:
-        for landmark in self._landmarks:
-            self._distances[landmark] = get_lca_tree(graph, landmark)
+        # trees come from Dijkstra on weighted graphs, depths are path lengths
+        n = len(self._vertices)
+        dtype = _distance_dtype(graph)
+        self._distances = np.full(
+            (len(self._landmarks), n), _unreachable(dtype), dtype=dtype
+        )
+        # tree parents by vertex column, the root and vertices outside the tree
+        # are their own parents
+        parents = np.tile(np.arange(n, dtype=np.int32), (len(self._landmarks), 1))
+
+        results = parallel_map(
+            shortest_path_tree, graph, self._landmarks, self._workers
+        )
+        for row, (tree, depths) in enumerate(results):
+            self._distances[row, self._columns(depths)] = list(depths.values())
+            parents[row, self._columns(tree)] = self._columns(tree.values())
+
+        self._ancestors = parents[None]
+        self._set_tree_tables()
+
+    def _set_tree_tables(self) -> None:
+        """
+        Уровни вершин и таблица двоичных подъёмов по предкам из _ancestors[0]
+
+        table[k, row, v] - предок v на 2^k уровней выше, корень является собственным
+        предком. Таблица и уровни строятся удвоением указателей, число слоёв около
+        log2(глубины) самого глубокого дерева. У вершин вне дерева уровень -1.
+        """
+        parents = self._ancestors[0]
+        rows = np.arange(len(parents))[:, None]
+        columns = np.arange(parents.shape[1])
+        # hops[v] - number of edges between v and jump[v]
+        hops = (parents != columns).astype(np.int32)
+        table = [parents]
+        jump = parents
+        while True:
+            next_jump = jump[rows, jump]
+            if np.array_equal(next_jump, jump):
+                break
+            hops += hops[rows, jump]
+            jump = next_jump
+            table.append(jump)
+
+        hops[self._distances == _unreachable(self._distances.dtype)] = -1
+        self._levels = hops
+        self._ancestors = np.stack(table)
+        self._stale = False
 
-    def distance(self, start: int, end: int) -> int:
-        upper_bounder = float("inf")
-        for landmark in self._landmarks:
-            lca_path = self._calculate_distance_over_by_landmark(landmark, start, end)
-            upper_bounder = min(upper_bounder, len(lca_path) - 1)
+    def _refresh_tables(self) -> None:
+        if self._stale:
+            self._set_tree_tables()
 
-        return upper_bounder
+    def _tables_changed(self) -> None:
+        # rebuilding the lifting table is deferred until the next query
+        self._stale = True
+
+    def _parent_row(self, row: int) -> np.ndarray:
+        return self._ancestors[0, row]
+
+    def _grow(self, capacity: int) -> None:
+        old_capacity = self._distances.shape[1]
+        super()._grow(capacity)
+        ancestors = np.empty(self._ancestors.shape[:2] + (capacity,), dtype=np.int32)
+        ancestors[..., :old_capacity] = self._ancestors
+        ancestors[..., old_capacity:] = np.arange(old_capacity, capacity)
+        self._ancestors = ancestors
+        levels = np.full((len(self._levels), capacity), -1, dtype=np.int32)
+        levels[:, :old_capacity] = self._levels
+        self._levels = levels
+
+    def save(self, path: str) -> None:
+        self._refresh_tables()
+        super().save(path)
+
+    def _upper_bounds(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        to_start: np.ndarray,
+        to_end: np.ndarray,
+    ) -> np.ndarray:
+        # the path through each tree: d(s) + d(t) - 2 d(lca)
+        rows, pairs = np.nonzero(np.isfinite(to_start) & np.isfinite(to_end))
+        lca = self._tree_lca(rows, starts[pairs], ends[pairs])
+        through_tree = np.full(to_start.shape, np.inf)
+        through_tree[rows, pairs] = (
+            to_start[rows, pairs]
+            + to_end[rows, pairs]
+            - 2 * self._distances[rows, lca].astype(np.float64)
+        )
+        return through_tree.min(axis=0, initial=np.inf)
+
+    def _tree_lca(self, rows: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Наименьшие общие предки вершин a и b в деревьях ориентиров rows за O(log глубины)"""
+        self._refresh_tables()
+        ancestors, levels = self._ancestors, self._levels
+        level_a, level_b = levels[rows, a], levels[rows, b]
+        # lift the deeper vertex to the level of the other one
+        swap = level_a < level_b
+        a, b = np.where(swap, b, a), np.where(swap, a, b)
+        lift = np.abs(level_a - level_b)
+        for k in range(len(ancestors)):
+            step = ((lift >> k) & 1).astype(bool)
+            a[step] = ancestors[k, rows[step], a[step]]
+
+        for k in range(len(ancestors) - 1, -1, -1):
+            up_a, up_b = ancestors[k, rows, a], ancestors[k, rows, b]
+            differ = up_a != up_b
+            a = np.where(differ, up_a, a)
+            b = np.where(differ, up_b, b)
+        return np.where(a == b, a, ancestors[0, rows, a])
 
     def _calculate_distance_over_by_landmark(
         self, landmark: int, start: int, end: int
     ) -> List[int]:
-        SPT = self._distances[landmark]
-        path_from_start_to_landmark = self.get_path_to_set(SPT, start, {landmark})
-        path_from_end_to_path_start_landmark = self.get_path_to_set(
-            SPT, end, set(path_from_start_to_landmark)
+        """Путь от start до end по дереву кратчайших путей ориентира"""
+        self._refresh_tables()
+        row = self._landmarks.index(landmark)
+        levels, parents = self._levels[row], self._ancestors[0, row]
+        start_col, end_col = self._index[start], self._index[end]
+        for v, col in ((start, start_col), (end, end_col)):
+            if levels[col] < 0:
+                raise KeyError(v)
+        lca = int(
+            self._tree_lca(np.array([row]), np.array([start_col]), np.array([end_col]))[0]
         )
 
-        LCA = path_from_end_to_path_start_landmark[-1]
+        def path_to_lca(col: int) -> List[int]:
+            path = [col]
+            while col != lca:
+                col = int(parents[col])
+                path.append(col)
+            return path
 
-        path = []
-        for node in path_from_start_to_landmark:
-            if node != LCA:
-                path.append(node)
-
-        path.extend(reversed(path_from_end_to_path_start_landmark))
-        return path
+        path = path_to_lca(start_col) + path_to_lca(end_col)[-2::-1]
+        return [self._vertices[col] for col in path]
 
     @staticmethod
     def get_path_to_set(
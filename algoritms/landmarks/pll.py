@@ -0,0 +1,242 @@
+import math
+import time
+from heapq import heappop, heappush
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from algoritms.instrumentation import current, instrumented
+from algoritms.landmarks.storage import graph_fingerprint, read_index, write_index
+from algoritms.landmarks.utils import SelectLandmarksMethod, select_landmarks
+from algoritms.shortest_paths import _weighted_adjacency
+from algoritms.utils import _distance_dtype, _unreachable
+from models import BaseGraph
+
+
+class PrunedLandmarkLabeling:
+    """
+    Точный оракул расстояний на 2-hop метках (pruned landmark labeling)
+
+    Вершины обрабатываются по убыванию степени, как при выборе ориентиров
+    SelectLandmarksMethod.MAX_DEGREE. Из каждой вершины запускается обход в ширину
+    (алгоритм Дейкстры для взвешенного графа), который не продолжается из вершин,
+    расстояние до которых уже восстанавливается по построенным меткам. Метка вершины -
+    список пар (хаб, расстояние) по возрастанию ранга хаба, расстояние между вершинами
+    равно минимуму d(s, h) + d(h, t) по общим хабам их меток.
+
+    Как и остальные алгоритмы, направление рёбер не учитывается.
+    """
+
+    def __init__(self, graph: BaseGraph):
+        self._graph = graph
+        start = time.perf_counter()
+        # vertices by decreasing degree, the position is the rank of the hub
+        self._vertices = select_landmarks(
+            graph, graph.num_vertices, SelectLandmarksMethod.MAX_DEGREE
+        )
+        self._index = {v: i for i, v in enumerate(self._vertices)}
+        self._build(graph)
+        self.build_time = time.perf_counter() - start
+
+    @instrumented("landmarks.pll_build")
+    def _build(self, graph: BaseGraph) -> None:
+        n = len(self._vertices)
+        index = self._index
+        adjacent = _weighted_adjacency(graph)
+        adjacency = [[(index[u], w) for u, w in adjacent(v)] for v in self._vertices]
+        weighted = graph.is_weighted()
+
+        label_hubs: List[List[int]] = [[] for _ in range(n)]
+        label_distances: List[List[int]] = [[] for _ in range(n)]
+        # distances from the current root to its hubs, indexed by hub rank
+        root_label = [math.inf] * n
+        tentative = [math.inf] * n
+        record = current()
+        for root in range(n):
+            for hub, d in zip(label_hubs[root], label_distances[root]):
+                root_label[hub] = d
+            search = self._pruned_dijkstra if weighted else self._pruned_bfs
+            visited = search(
+                root, adjacency, label_hubs, label_distances, root_label, tentative
+            )
+            for hub in label_hubs[root]:
+                root_label[hub] = math.inf
+            if record is not None:
+                # vertices labelled by this search are the ones it expanded
+                expanded = [v for v in visited if label_hubs[v][-1:] == [root]]
+                record.vertices_visited += len(expanded)
+                record.edges_scanned += sum(len(adjacency[v]) for v in expanded)
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(hubs) for hubs in label_hubs], out=offsets[1:])
+        dtype = _distance_dtype(graph)
+        largest = max((max(d) for d in label_distances if d), default=0)
+        if largest >= _unreachable(dtype):
+            raise OverflowError(f"distance {largest} does not fit {np.dtype(dtype)}")
+        self._offsets = offsets
+        self._hubs = np.fromiter(
+            (hub for hubs in label_hubs for hub in hubs), dtype=np.int32, count=offsets[-1]
+        )
+        self._distances = np.fromiter(
+            (d for distances in label_distances for d in distances),
+            dtype=dtype,
+            count=offsets[-1],
+        )
+
+    @staticmethod
+    def _covered(
+        hubs: List[int], distances: List[int], root_label: List[float], d: int
+    ) -> bool:
+        """Восстанавливается ли по меткам расстояние не больше d"""
+        for hub, to_hub in zip(hubs, distances):
+            if to_hub + root_label[hub] <= d:
+                return True
+        return False
+
+    def _pruned_bfs(
+        self,
+        root: int,
+        adjacency: List[List[Tuple[int, int]]],
+        label_hubs: List[List[int]],
+        label_distances: List[List[int]],
+        root_label: List[float],
+        tentative: List[float],
+    ) -> List[int]:
+        tentative[root] = 0
+        visited = [root]
+        frontier = [root]
+        d = 0
+        while frontier:
+            next_frontier = []
+            for v in frontier:
+                if self._covered(label_hubs[v], label_distances[v], root_label, d):
+                    continue
+                label_hubs[v].append(root)
+                label_distances[v].append(d)
+                for u, _ in adjacency[v]:
+                    if u > root and tentative[u] == math.inf:
+                        tentative[u] = d + 1
+                        visited.append(u)
+                        next_frontier.append(u)
+            frontier = next_frontier
+            d += 1
+        for v in visited:
+            tentative[v] = math.inf
+        return visited
+
+    def _pruned_dijkstra(
+        self,
+        root: int,
+        adjacency: List[List[Tuple[int, int]]],
+        label_hubs: List[List[int]],
+        label_distances: List[List[int]],
+        root_label: List[float],
+        tentative: List[float],
+    ) -> List[int]:
+        tentative[root] = 0
+        visited = [root]
+        settled = set()
+        heap = [(0, root)]
+        while heap:
+            d, v = heappop(heap)
+            if v in settled:
+                continue
+            settled.add(v)
+            if self._covered(label_hubs[v], label_distances[v], root_label, d):
+                continue
+            label_hubs[v].append(root)
+            label_distances[v].append(d)
+            for u, w in adjacency[v]:
+                if w < 0:
+                    raise ValueError(f"negative edge weight {w}")
+                # vertices of a higher rank already hold every distance to them
+                if u > root and d + w < tentative[u]:
+                    if tentative[u] == math.inf:
+                        visited.append(u)
+                    tentative[u] = d + w
+                    heappush(heap, (d + w, u))
+        for v in visited:
+            tentative[v] = math.inf
+        return visited
+
+    @property
+    def index_size(self) -> Dict[str, Union[int, float]]:
+        """Число пар (хаб, расстояние) во всех метках, средний размер метки и объём в байтах"""
+        entries = int(self._offsets[-1])
+        return {
+            "entries": entries,
+            "average_label": entries / len(self._vertices) if self._vertices else 0,
+            "bytes": self._offsets.nbytes + self._hubs.nbytes + self._distances.nbytes,
+        }
+
+    def _label(self, v: int) -> Tuple[List[int], List[int]]:
+        col = self._index[v]
+        begin, end = int(self._offsets[col]), int(self._offsets[col + 1])
+        return self._hubs[begin:end].tolist(), self._distances[begin:end].tolist()
+
+    def distance(self, start: int, end: int) -> Union[int, float]:
+        """
+        Точное расстояние между start и end, inf для недостижимой вершины
+
+        Метки сливаются как отсортированные по рангу хаба списки.
+        """
+        hubs_a, distances_a = self._label(start)
+        hubs_b, distances_b = self._label(end)
+        best = math.inf
+        i = j = 0
+        while i < len(hubs_a) and j < len(hubs_b):
+            if hubs_a[i] == hubs_b[j]:
+                best = min(best, distances_a[i] + distances_b[j])
+                i += 1
+                j += 1
+            elif hubs_a[i] < hubs_b[j]:
+                i += 1
+            else:
+                j += 1
+        return best
+
+    @instrumented("landmarks.pll_distance_many")
+    def distance_many(
+        self, pairs: Union[Sequence[Tuple[int, int]], np.ndarray]
+    ) -> np.ndarray:
+        """Точные расстояния для набора пар (start, end), inf - недостижимо"""
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        return np.fromiter(
+            (self.distance(s, t) for s, t in pairs.tolist()),
+            dtype=np.float64,
+            count=len(pairs),
+        )
+
+    def save(self, path: str) -> None:
+        """Сохранить метки в файл вместе с отпечатком графа"""
+        header = {
+            "class": type(self).__name__,
+            "graph": graph_fingerprint(self._graph),
+            "build_time": self.build_time,
+        }
+        arrays = {
+            "vertices": np.asarray(self._vertices, dtype=np.int64),
+            "offsets": self._offsets,
+            "hubs": self._hubs,
+            "distances": self._distances,
+        }
+        write_index(path, header, arrays)
+
+    @classmethod
+    def load(cls, path: str, graph: BaseGraph) -> "PrunedLandmarkLabeling":
+        """Загрузить метки, сохранённые save; массивы отображаются в память"""
+        header, arrays = read_index(path)
+        if header["class"] != cls.__name__:
+            raise ValueError(f"{path} holds {header['class']}, not {cls.__name__}")
+        if header["graph"] != graph_fingerprint(graph):
+            raise ValueError(f"{path} was built for a different graph")
+
+        oracle = cls.__new__(cls)
+        oracle._graph = graph
+        oracle._vertices = arrays["vertices"].tolist()
+        oracle._index = {v: i for i, v in enumerate(oracle._vertices)}
+        oracle._offsets = arrays["offsets"]
+        oracle._hubs = arrays["hubs"]
+        oracle._distances = arrays["distances"]
+        oracle.build_time = header["build_time"]
+        return oracle
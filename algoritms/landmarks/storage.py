@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from models import BaseGraph
+
+MAGIC = b"GRPHLMRK"
+VERSION = 1
+# magic, format version, length of the JSON header
+_PREAMBLE = struct.Struct("<8sII")
+# arrays start at offsets aligned for memory mapping
+_ALIGNMENT = 64
+
+
+def graph_fingerprint(graph: BaseGraph) -> Dict[str, Any]:
+    """Признаки графа, по которым индекс сверяется с графом при загрузке"""
+    vertices = np.array(sorted(graph.get_all_vertices()), dtype=np.int64)
+    degrees = np.fromiter(
+        (len(graph.neighbors[v]) for v in vertices.tolist()),
+        dtype=np.int64,
+        count=len(vertices),
+    )
+    digest = hashlib.sha256(vertices.tobytes())
+    digest.update(degrees.tobytes())
+    return {
+        "vertices": len(vertices),
+        "edges": graph.num_edges,
+        "directed": graph.is_directed(),
+        "weighted": graph.is_weighted(),
+        "digest": digest.hexdigest(),
+    }
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_index(path: str, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Записать массивы индекса в один файл
+
+    Файл состоит из преамбулы, JSON-заголовка с описанием массивов и самих массивов,
+    выровненных по 64 байтам. Запись атомарна: файл пишется во временный и
+    переименовывается.
+    """
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+    encoded = json.dumps(dict(header, arrays=layout)).encode()
+    data_start = _align(_PREAMBLE.size + len(encoded))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(_PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+            file.write(encoded)
+            for name, array in arrays.items():
+                file.seek(data_start + layout[name]["offset"])
+                file.write(np.ascontiguousarray(array).tobytes())
+            file.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_index(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Прочитать заголовок индекса и отобразить его массивы в память только для чтения
+
+    Страницы массивов загружаются по мере обращения и разделяются процессами,
+    открывшими один и тот же файл.
+    """
+    with open(path, "rb") as file:
+        preamble = file.read(_PREAMBLE.size)
+        if len(preamble) != _PREAMBLE.size:
+            raise ValueError(f"{path} is not a landmark index")
+        magic, version, header_size = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark index")
+        if version != VERSION:
+            raise ValueError(f"unsupported landmark index version {version}")
+        header = json.loads(file.read(header_size))
+
+    data_start = _align(_PREAMBLE.size + header_size)
+    arrays = {}
+    for name, spec in header.pop("arrays").items():
+        shape = tuple(spec["shape"])
+        if 0 in shape:
+            # numpy cannot map an empty region
+            arrays[name] = np.empty(shape, dtype=spec["dtype"])
+            continue
+        arrays[name] = np.memmap(
+            path,
+            dtype=spec["dtype"],
+            mode="r",
+            offset=data_start + spec["offset"],
+            shape=shape,
+        )
+    return header, arrays
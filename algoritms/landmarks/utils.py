@@ -1,9 +1,12 @@
+import heapq
 import random
-from collections import deque
+from collections import defaultdict, deque
 from enum import Enum
 from random import sample
-from typing import Dict, Set, List
+from typing import Dict, List
 
+from algoritms.degrees import degrees
+from algoritms.shortest_paths import shortest_path_tree
 from models import BaseGraph
 
 
@@ -19,13 +22,8 @@ def get_lca_tree(graph: BaseGraph, vertex: int) -> Dict[int, int]:
     return tree
 
 
-def compute_coverage(paths: Set[Set[int]], node: int) -> int:
-    coverage = 0
-    for path in paths:
-        if node in path:
-            coverage += 1
-
-    return coverage
+BEST_COVERAGE_PATHS = 500
+BEST_COVERAGE_TARGETS = 10
 
 
 class SelectLandmarksMethod(Enum):
@@ -41,55 +39,91 @@ def select_landmarks(
     graph: BaseGraph,
     count_landmarks: int,
     method: SelectLandmarksMethod = SelectLandmarksMethod.RANDOM,
+    paths_count: int = BEST_COVERAGE_PATHS,
+    targets_per_source: int = BEST_COVERAGE_TARGETS,
 ) -> List[int]:
+    """
+    Выбрать вершины-ориентиры
+
+    :param paths_count: Число случайных кратчайших путей для BEST_COVERAGE
+    :param targets_per_source: Число путей из одного дерева кратчайших путей для
+        BEST_COVERAGE, дерево строится один раз на источник
+    """
     if method == SelectLandmarksMethod.RANDOM:
         return sample(tuple(graph.get_all_vertices()), count_landmarks)
 
     elif method == SelectLandmarksMethod.MAX_DEGREE:
-        sorted_all_vertices = sorted(
-            graph.get_all_vertices(),
-            key=lambda v: len(graph.neighbors[v]),
-            reverse=True,
-        )
-        return sorted_all_vertices[:count_landmarks]
+        return list(degrees(graph).by_degree[:count_landmarks])
 
     elif method == SelectLandmarksMethod.BEST_COVERAGE:
-        all_vert = graph.get_all_vertices()
-        count_shortest_path = len(all_vert) % 500
-        all_paths = set()
-
-        for _ in range(count_shortest_path):
-            start, end = random.sample(tuple(all_vert), 2)
-            tree = get_lca_tree(graph, start)
-            path = {end}
-            node = end
-            while node != start:
-                node = tree[node]
-                path.add(node)
-
-            all_paths.add(frozenset(path))
-
-        landmarks = []
-        while len(landmarks) < count_landmarks and all_paths:
-            best_coverage = 0
-            best_landmark = None
-
-            for v in all_vert:
-                v_coverage = compute_coverage(all_paths, v)
-                if v_coverage > best_coverage:
-                    best_coverage = v_coverage
-                    best_landmark = v
-
-            landmarks.append(best_landmark)
-            all_paths = set(filter(lambda s: best_landmark not in s, all_paths))
-            all_vert.remove(best_landmark)
-
-        # if len(landmarks) < count_landmarks:
-        #     landmarks.extend(random.sample(all_vert, count_landmarks - len(landmarks)))
-
-        return landmarks
+        return _best_coverage(graph, count_landmarks, paths_count, targets_per_source)
 
     elif method == SelectLandmarksMethod.MANUAL:
         return list(map(int, input("Landmarks: ").split()))
 
     raise NotImplementedError
+
+
+def _sample_paths(
+    graph: BaseGraph, paths_count: int, targets_per_source: int
+) -> List[List[int]]:
+    """Случайные кратчайшие пути, по несколько из дерева каждого источника"""
+    vertices = tuple(graph.get_all_vertices())
+    if len(vertices) < 2:
+        return []
+
+    paths = []
+    attempts = 0
+    while len(paths) < paths_count and attempts < paths_count:
+        attempts += 1
+        source = random.choice(vertices)
+        parent, _ = shortest_path_tree(graph, source)
+        reached = list(parent)
+        take = min(targets_per_source, paths_count - len(paths), len(reached))
+        for end in random.sample(reached, take):
+            path = [end]
+            while path[-1] != source:
+                path.append(parent[path[-1]])
+            paths.append(path)
+    return paths
+
+
+def _best_coverage(
+    graph: BaseGraph, count_landmarks: int, paths_count: int, targets_per_source: int
+) -> List[int]:
+    """
+    Жадное покрытие случайных кратчайших путей вершинами-ориентирами
+
+    Для каждой вершины хранится список содержащих её путей, выбор идёт ленивым
+    жадным алгоритмом (CELF): покрытие вершины может только уменьшаться, поэтому
+    пересчитывается лишь для вершины на вершине кучи. Выбор заканчивается, когда
+    все пути покрыты, поэтому ориентиров может оказаться меньше count_landmarks.
+    """
+    paths_of = defaultdict(list)
+    paths = _sample_paths(graph, paths_count, targets_per_source)
+    for path_id, path in enumerate(paths):
+        for v in path:
+            paths_of[v].append(path_id)
+
+    covered = bytearray(len(paths))
+    uncovered = len(paths)
+    # (-coverage, vertex, number of landmarks when the coverage was computed)
+    heap = [(-len(ids), v, 0) for v, ids in paths_of.items()]
+    heapq.heapify(heap)
+
+    landmarks = []
+    while heap and uncovered and len(landmarks) < count_landmarks:
+        _, v, computed_at = heapq.heappop(heap)
+        if computed_at != len(landmarks):
+            coverage = sum(1 for p in paths_of[v] if not covered[p])
+            if coverage:
+                heapq.heappush(heap, (-coverage, v, len(landmarks)))
+            continue
+
+        landmarks.append(v)
+        for p in paths_of[v]:
+            if not covered[p]:
+                covered[p] = 1
+                uncovered -= 1
+
+    return landmarks
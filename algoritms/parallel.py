@@ -0,0 +1,74 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Sequence
+
+_worker_func = None
+_worker_shared = None
+
+
+def _init_worker(func: Callable[[Any, Any], Any], shared: Any) -> None:
+    global _worker_func, _worker_shared
+    _worker_func = func
+    _worker_shared = shared
+
+
+def _run_task(item: Any) -> Any:
+    return _worker_func(_worker_shared, item)
+
+
+def _context():
+    # fork lets workers inherit the shared data instead of unpickling it
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def parallel_imap(
+    func: Callable[[Any, Any], Any],
+    shared: Any,
+    items: Sequence[Any],
+    workers: int = 1,
+) -> Iterator[Any]:
+    """
+    Вычислить func(shared, item) для всех items в пуле процессов
+
+    Данные shared (например, граф) передаются каждому процессу один раз при запуске,
+    а не с каждой задачей; при запуске через fork они вообще не сериализуются и
+    используются процессами только для чтения. Результаты выдаются в порядке items,
+    поэтому не зависят от числа процессов. При workers <= 1 пул не создаётся.
+    """
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            yield func(shared, item)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(items)),
+        mp_context=_context(),
+        initializer=_init_worker,
+        initargs=(func, shared),
+    ) as executor:
+        yield from executor.map(_run_task, items)
+
+
+def parallel_map(
+    func: Callable[[Any, Any], Any],
+    shared: Any,
+    items: Sequence[Any],
+    workers: int = 1,
+) -> List[Any]:
+    """Список результатов parallel_imap"""
+    return list(parallel_imap(func, shared, items, workers))
+
+
+def split(items: Sequence[Any], parts: int) -> List[Sequence[Any]]:
+    """Разбить items на parts последовательных частей почти равного размера"""
+    parts = max(1, min(parts, len(items)))
+    size, rest = divmod(len(items), parts)
+    chunks = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < rest else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
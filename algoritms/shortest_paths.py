@@ -0,0 +1,266 @@
+import math
+from heapq import heappop, heappush
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from algoritms.instrumentation import count_scanned, current, instrumented
+from models import BaseGraph
+
+Distance = float
+
+
+def _weighted_adjacency(graph: BaseGraph) -> Callable[[int], Iterator[Tuple[int, int]]]:
+    """
+    Соседи вершины с весами рёбер (1 для невзвешенного графа)
+
+    Направление рёбер не учитывается, как и в обходе по neighbors: для
+    ориентированного графа перебираются и исходящие, и входящие рёбра.
+    """
+    if not graph.is_weighted():
+        neighbors = graph.neighbors
+
+        def adjacent_unweighted(v: int) -> Iterator[Tuple[int, int]]:
+            for u in neighbors[v]:
+                yield u, 1
+
+        return adjacent_unweighted
+
+    outgoing = graph.outgoing_adj_list
+    incoming = graph.incoming_adj_list
+    directed = graph.is_directed()
+
+    def adjacent(v: int) -> Iterator[Tuple[int, int]]:
+        if v in outgoing:
+            for edge in outgoing[v]:
+                yield edge.end, edge.weight
+        if directed and v in incoming:
+            for edge in incoming[v]:
+                yield edge.start, edge.weight
+
+    return adjacent
+
+
+def _dijkstra(
+    graph: BaseGraph, source: int, targets: Optional[Iterable[int]] = None
+) -> Tuple[Dict[int, Distance], Dict[int, int]]:
+    """Расстояния до обработанных вершин и предки в дереве кратчайших путей"""
+    adjacent = _weighted_adjacency(graph)
+    targets_left = None if targets is None else set(targets)
+
+    settled = {}
+    tentative = {source: 0}
+    parent = {}
+    heap = [(0, source)]
+    while heap:
+        d, v = heappop(heap)
+        if v in settled:
+            continue
+        settled[v] = d
+        if targets_left is not None:
+            targets_left.discard(v)
+            if not targets_left:
+                break
+
+        for u, w in adjacent(v):
+            if w < 0:
+                raise ValueError(f"negative edge weight {w} between {v} and {u}")
+            du = d + w
+            if du < tentative.get(u, math.inf):
+                tentative[u] = du
+                parent[u] = v
+                heappush(heap, (du, u))
+
+    count_scanned(graph, settled)
+    return settled, parent
+
+
+@instrumented()
+def dijkstra(
+    graph: BaseGraph, source: int, targets: Optional[Iterable[int]] = None
+) -> Dict[int, Distance]:
+    """
+    Кратчайшие расстояния от source алгоритмом Дейкстры на двоичной куче
+
+    :param targets: Вершины, расстояния до которых нужны. Поиск останавливается, как
+        только все они обработаны; None - обойти всю компоненту source
+    :return: Расстояния до обработанных вершин (недостижимых вершин в словаре нет)
+    """
+    return _dijkstra(graph, source, targets)[0]
+
+
+@instrumented()
+def shortest_path_tree(
+    graph: BaseGraph, source: int
+) -> Tuple[Dict[int, int], Dict[int, Distance]]:
+    """
+    Дерево кратчайших путей с корнем source
+
+    Для взвешенного графа строится алгоритмом Дейкстры, иначе обходом в ширину.
+
+    :return: Предки вершин в дереве (у корня предка нет) и расстояния до вершин
+    """
+    if graph.is_weighted():
+        distances, parent = _dijkstra(graph, source)
+        return parent, distances
+
+    parent = {}
+    distances = {source: 0}
+    frontier = [source]
+    neighbors = graph.neighbors
+    record = current()
+    level = 0
+    while frontier:
+        if record is not None:
+            record.frontier_sizes.append(len(frontier))
+            record.vertices_visited += len(frontier)
+            record.edges_scanned += sum(len(neighbors[v]) for v in frontier)
+        level += 1
+        next_frontier = []
+        for v in frontier:
+            for u in neighbors[v]:
+                if u not in distances:
+                    distances[u] = level
+                    parent[u] = v
+                    next_frontier.append(u)
+        frontier = next_frontier
+    return parent, distances
+
+
+@instrumented()
+def bidirectional_dijkstra(
+    graph: BaseGraph, source: int, target: int
+) -> Tuple[Distance, List[int]]:
+    """
+    Кратчайший путь между source и target двунаправленным алгоритмом Дейкстры
+
+    Поиски ведутся от обоих концов, на каждом шаге продвигается тот, у которого
+    меньше куча. Поиск останавливается, когда сумма минимальных ключей куч не меньше
+    длины лучшего найденного пути.
+
+    :return: Длина пути и сам путь; для недостижимой target - (inf, [])
+    """
+    if source == target:
+        return 0, [source]
+
+    adjacent = _weighted_adjacency(graph)
+    tentative = ({source: 0}, {target: 0})
+    parent = ({}, {})
+    settled = (set(), set())
+    heaps = ([(0, source)], [(0, target)])
+
+    best = math.inf
+    meeting = None
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        d, v = heappop(heaps[side])
+        if v in settled[side]:
+            continue
+        settled[side].add(v)
+
+        dist, other = tentative[side], tentative[1 - side]
+        for u, w in adjacent(v):
+            if w < 0:
+                raise ValueError(f"negative edge weight {w} between {v} and {u}")
+            du = d + w
+            if du < dist.get(u, math.inf):
+                dist[u] = du
+                parent[side][u] = v
+                heappush(heaps[side], (du, u))
+            if u in other and dist[u] + other[u] < best:
+                best = dist[u] + other[u]
+                meeting = u
+
+    for side in settled:
+        count_scanned(graph, side)
+    if meeting is None:
+        return math.inf, []
+
+    path = [meeting]
+    while path[-1] != source:
+        path.append(parent[0][path[-1]])
+    path.reverse()
+    while path[-1] != target:
+        path.append(parent[1][path[-1]])
+    return best, path
+
+
+def _bidirectional_bfs(
+    graph: BaseGraph, source: int, target: int
+) -> Tuple[Distance, List[int]]:
+    """
+    Двунаправленный обход в ширину, на каждом шаге расширяется меньший фронт
+
+    Пока шары вокруг концов не пересекаются, путь длиннее суммы их радиусов, поэтому
+    первая найденная общая вершина лежит на кратчайшем пути.
+    """
+    if source == target:
+        return 0, [source]
+
+    neighbors = graph.neighbors
+    parent = ({source: None}, {target: None})
+    frontier = ([source], [target])
+    radius = [0, 0]
+    record = current()
+    while frontier[0] and frontier[1]:
+        side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+        if record is not None:
+            # the level may stop early at the meeting vertex, counted in full
+            record.frontier_sizes.append(len(frontier[side]))
+            record.vertices_visited += len(frontier[side])
+            record.edges_scanned += sum(len(neighbors[v]) for v in frontier[side])
+        own, other = parent[side], parent[1 - side]
+        next_frontier = []
+        for v in frontier[side]:
+            for u in neighbors[v]:
+                if u in own:
+                    continue
+                own[u] = v
+                if u in other:
+                    return radius[0] + radius[1] + 1, _join_paths(parent, u)
+                next_frontier.append(u)
+        frontier[side][:] = next_frontier
+        radius[side] += 1
+
+    return math.inf, []
+
+
+def _join_paths(parent: Tuple[Dict[int, int], Dict[int, int]], meeting: int) -> List[int]:
+    path = []
+    v = meeting
+    while v is not None:
+        path.append(v)
+        v = parent[0][v]
+    path.reverse()
+    v = parent[1][meeting]
+    while v is not None:
+        path.append(v)
+        v = parent[1][v]
+    return path
+
+
+def shortest_distance(graph: BaseGraph, source: int, target: int) -> Distance:
+    """
+    Точное расстояние между source и target
+
+    Обход ведётся одновременно от обоих концов (для взвешенного графа -
+    двунаправленный алгоритм Дейкстры), поэтому обычно затрагивает лишь небольшие
+    окрестности вершин. Для недостижимой target возвращается inf.
+    """
+    return shortest_path_with_distance(graph, source, target)[0]
+
+
+def shortest_path(graph: BaseGraph, source: int, target: int) -> List[int]:
+    """Кратчайший путь от source до target, пустой список для недостижимой target"""
+    return shortest_path_with_distance(graph, source, target)[1]
+
+
+@instrumented()
+def shortest_path_with_distance(
+    graph: BaseGraph, source: int, target: int
+) -> Tuple[Distance, List[int]]:
+    """Расстояние и кратчайший путь между source и target"""
+    if graph.is_weighted():
+        return bidirectional_dijkstra(graph, source, target)
+    return _bidirectional_bfs(graph, source, target)
@@ -0,0 +1,68 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Mapping
+
+from algoritms.cache import cached
+from algoritms.instrumentation import count_scanned, instrumented
+from models import BaseGraph
+
+
+@dataclass(frozen=True)
+class Triangles:
+    """
+    Треугольники графа без учёта направления рёбер, кратных рёбер и петель
+
+    Результат хранится в кеше и разделяется всеми вызовами для неизменённого графа,
+    словари per_vertex и degrees нельзя изменять.
+
+    :param total: Число треугольников
+    :param per_vertex: Число треугольников, содержащих вершину
+    :param degrees: Число различных соседей вершины
+    """
+
+    total: int
+    per_vertex: Mapping[int, int]
+    degrees: Mapping[int, int]
+
+
+@instrumented()
+def triangles(graph: BaseGraph) -> Triangles:
+    """Подсчёт треугольников, вычисленный один раз для неизменённого графа"""
+    return cached(graph, "triangles", _count_triangles)
+
+
+def _count_triangles(graph: BaseGraph) -> Triangles:
+    """
+    Алгоритм forward: рёбра ориентируются от вершины меньшей степени к большей,
+    и каждый треугольник находится ровно один раз пересечением множеств
+    исходящих соседей концов ребра
+    """
+    vertices = graph.get_all_vertices()
+    adjacency = {
+        v: {u for u in graph.neighbors[v] if u != v and u in vertices}
+        for v in vertices
+    }
+    count_scanned(graph, vertices)
+    degrees = {v: len(adj) for v, adj in adjacency.items()}
+
+    rank = {
+        v: i for i, v in enumerate(sorted(vertices, key=degrees.__getitem__))
+    }
+    for v, adj in adjacency.items():
+        v_rank = rank[v]
+        adjacency[v] = {u for u in adj if rank[u] > v_rank}
+    del rank
+
+    total = 0
+    per_vertex = Counter()
+    for v, forward in adjacency.items():
+        for u in forward:
+            common = forward & adjacency[u]
+            if common:
+                found = len(common)
+                total += found
+                per_vertex[v] += found
+                per_vertex[u] += found
+                per_vertex.update(common)
+
+    return Triangles(total, {v: per_vertex[v] for v in vertices}, degrees)
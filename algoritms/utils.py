@@ -1,345 +1,723 @@
-import copy
-from scipy.special import comb
+from dataclasses import dataclass
+from itertools import accumulate
+import math
+import numpy as np
 import random
-from typing import List, Tuple, Optional, Dict, Union, Callable, Any, Set
-from collections import deque, defaultdict, OrderedDict
+from typing import List, Tuple, Optional, Dict, Union, Callable, Any, Set, Iterable, Sequence
+from collections import defaultdict
 
-from models import BaseGraph, UndirectedGraph, UndirectedWeightedGraph
+from algoritms.cache import cached
+from algoritms.components import DisjointSet, strong_components, weak_components
+from algoritms.degrees import degrees
+from algoritms.instrumentation import count_scanned, current, instrumented
+from algoritms.parallel import parallel_imap, parallel_map, split
+from algoritms.shortest_paths import _weighted_adjacency, dijkstra
+from algoritms.triangles import triangles
+from models import BaseGraph, SubgraphView, UndirectedGraph, UndirectedWeightedGraph
 
 
+@instrumented()
 def weak_conns(graph: BaseGraph) -> List[Set[int]]:
     """Поиск компонент слабой связности"""
-
-    unvisited = copy.deepcopy(graph.get_all_vertices())
-    comps = []
-
-    while unvisited:
-        start = unvisited.pop()
-        comps.append(set())
-        stack = deque([start])
-        while stack:
-            v = stack[-1]
-            unvisited.discard(v)
-            for out_edge in graph.outgoing_adj_list[v]:
-                if out_edge.end in unvisited:
-                    stack.append(out_edge.end)
-                    break
-            else:
-                for in_edge in graph.incoming_adj_list[v]:
-                    if in_edge.start in unvisited:
-                        stack.append(in_edge.start)
-                        break
-                else:
-                    stack.pop()
-                    comps[-1].add(v)
-    return comps
+    return [set(comp) for comp in weak_components(graph).members]
 
 
+@instrumented()
 def weak_conns_num(graph: BaseGraph) -> int:
     """Поиск числа компонент слабой связности"""
-
-    unvisited = graph.get_all_vertices()
-    cnt = 0
-
-    while unvisited:
-        start = unvisited.pop()
-        cnt += 1
-        stack = deque([start])
-        while stack:
-            v = stack[-1]
-            unvisited.discard(v)
-            for end in graph.neighbors[v]:
-                if end in unvisited:
-                    stack.append(end)
-                    break
-            else:
-                stack.pop()
-
-    return cnt
+    return len(weak_components(graph).sizes)
 
 
+@instrumented()
 def max_weak_conns_num(graph: BaseGraph) -> int:
     """Поиск числа вершин в наибольшей компоненте слабой связности"""
-
-    unvisited = graph.get_all_vertices()
-    current = 0
-    max_wc = 0
-
-    while unvisited:
-        start = unvisited.pop()
-        max_wc = max(max_wc, current)
-        current = 0
-        stack = deque([start])
-        while stack:
-            v = stack[-1]
-            unvisited.discard(v)
-            for end in graph.neighbors[v]:
-                if end in unvisited:
-                    stack.append(end)
-                    break
-            else:
-                stack.pop()
-                current += 1
-
-    max_wc = max(max_wc, current)
-    return max_wc
+    return max(weak_components(graph).sizes, default=0)
 
 
+@instrumented()
 def strong_conns(graph: BaseGraph) -> List[Set[int]]:
     """Поиск компонент сильной связности"""
-
-    unvisited = copy.deepcopy(graph.get_all_vertices())
-    time = len(unvisited)
-    ver_priority = OrderedDict()
-    while unvisited:
-        # DFS on inverted graph
-        start = unvisited.pop()
-        stack = deque([start])
-        while stack:
-            v = stack[-1]
-            unvisited.discard(v)
-            for in_edge in graph.incoming_adj_list[v]:
-                if in_edge.start in unvisited:
-                    stack.append(in_edge.start)
-                    break
-            else:
-                stack.pop()
-                ver_priority[v] = time
-                time -= 1
-
-    # DFS on normal graph with new order
-    comps = []
-    while ver_priority:
-        start = ver_priority.popitem()[0]
-        stack = deque([[start, graph.out_vertices_by_priority(start, ver_priority)]])
-        comps.append(set())
-        while stack:
-            v, next_vertex_gen = stack[-1]
-            if ver_priority.get(v):
-                ver_priority.pop(v)
-
-            for out in next_vertex_gen:
-                stack.append([out, graph.out_vertices_by_priority(out, ver_priority)])
-                break
-            else:
-                stack.pop()
-                comps[-1].add(v)
-    return comps
+    return [set(comp) for comp in strong_components(graph).members]
 
 
+@instrumented()
 def get_shortest_path_lengths(
     graph: BaseGraph, source: int, vertices: Optional[Union[List[int], Set[int]]]
 ) -> Dict[int, int]:
-    """Кротчайшее расстояние от v до вершин vertices поиском в ширину"""
+    """
+    Кротчайшее расстояние от v до вершин vertices поиском в ширину
+
+    Для взвешенного графа используется алгоритм Дейкстры, недостижимые вершины
+    получают расстояние inf.
+    """
+    if graph.is_weighted():
+        lengths = dijkstra(graph, source, vertices)
+        return {v: lengths.get(v, math.inf) for v in vertices}
 
+    record = current()
     unvisited_target_vertices = set(vertices)
     unvisited_target_vertices.discard(source)
     lengths = {source: 0}
-    queue = deque([(source, 0)])
-    while unvisited_target_vertices:
-        v, length = queue.popleft()
-        for n in graph.neighbors[v]:
-            if n not in lengths:
-                queue.append((n, length + 1))
-                lengths[n] = length + 1
-                unvisited_target_vertices.discard(n)
+    neighbors = graph.neighbors
+    frontier = [source]
+    length = 0
+    while unvisited_target_vertices and frontier:
+        length += 1
+        next_frontier = []
+        expanded = 0
+        for v in frontier:
+            expanded += 1
+            for n in neighbors[v]:
+                if n not in lengths:
+                    next_frontier.append(n)
+                    lengths[n] = length
+                    unvisited_target_vertices.discard(n)
+            if not unvisited_target_vertices:
+                break
+        if record is not None:
+            record.frontier_sizes.append(len(frontier))
+            record.vertices_visited += expanded
+            record.edges_scanned += sum(len(neighbors[v]) for v in frontier[:expanded])
+        frontier = next_frontier
+
+    return {v: lengths.get(v, math.inf) for v in vertices}
+
+
+def _write_level(
+    frontier: Dict[int, int],
+    column: Dict[int, int],
+    distances: np.ndarray,
+    level: int,
+    batch_size: int,
+) -> int:
+    """Записать уровень level для новых пар (источник, вершина), вернуть их число"""
+    cols = []
+    masks = []
+    for v, mask in frontier.items():
+        col = column.get(v)
+        if col is not None:
+            cols.append(col)
+            masks.append(mask)
+    if not cols:
+        return 0
+
+    width = (batch_size + 7) // 8
+    packed = np.frombuffer(
+        b"".join(mask.to_bytes(width, "little") for mask in masks), dtype=np.uint8
+    ).reshape(len(masks), width)
+    bits = np.unpackbits(packed, axis=1, count=batch_size, bitorder="little")
+    rows, sources = np.nonzero(bits)
+    distances[sources, np.asarray(cols)[rows]] = level
+    return len(rows)
 
-    return {v: lengths[v] for v in vertices}
 
+def _integer_weights(graph: BaseGraph) -> bool:
+    adjacent = _weighted_adjacency(graph)
+    return all(w == int(w) for v in graph.get_all_vertices() for _, w in adjacent(v))
 
+
+def _distance_dtype(graph: BaseGraph) -> type:
+    """
+    Тип элементов матрицы расстояний графа
+
+    Взвешенные расстояния не помещаются в uint16, для дробных весов нужен float64.
+    """
+    if not graph.is_weighted():
+        return np.uint16
+    return np.uint32 if cached(graph, "integer_weights", _integer_weights) else np.float64
+
+
+def _unreachable(dtype: type) -> Union[int, float]:
+    """Значение, которым в матрице расстояний типа dtype отмечены недостижимые пары"""
+    return math.inf if np.issubdtype(dtype, np.floating) else int(np.iinfo(dtype).max)
+
+
+def _bit_parallel_bfs(
+    graph: BaseGraph,
+    sources: List[int],
+    column: Dict[int, int],
+    distances: np.ndarray,
+) -> None:
+    """
+    Одновременный обход в ширину из всех sources
+
+    Для каждой вершины хранится битовая маска источников, уже достигших её, так что
+    один проход по фронту продвигает все обходы на уровень вперёд.
+    """
+    unreachable = _unreachable(distances.dtype)
+    targets_left = len(sources) * len(column)
+
+    seen = {}
+    for i, s in enumerate(sources):
+        seen[s] = seen.get(s, 0) | (1 << i)
+    frontier = dict(seen)
+
+    level = 0
+    neighbors = graph.neighbors
+    record = current()
+    while frontier:
+        if level >= unreachable:
+            raise OverflowError(f"distance {level} does not fit {distances.dtype}")
+        targets_left -= _write_level(frontier, column, distances, level, len(sources))
+        if record is not None:
+            record.frontier_sizes.append(len(frontier))
+        if not targets_left:
+            break
+        if record is not None:
+            record.vertices_visited += len(frontier)
+            record.edges_scanned += sum(len(neighbors[v]) for v in frontier)
+
+        reached = {}
+        for v, mask in frontier.items():
+            for n in neighbors[v]:
+                reached[n] = reached.get(n, 0) | mask
+
+        frontier = {}
+        for v, mask in reached.items():
+            visited = seen.get(v, 0)
+            new = mask & ~visited
+            if new:
+                seen[v] = visited | new
+                frontier[v] = new
+        level += 1
+
+
+def _fill_weighted_distances(
+    graph: BaseGraph,
+    sources: List[int],
+    column: Dict[int, int],
+    distances: np.ndarray,
+) -> None:
+    unreachable = _unreachable(distances.dtype)
+    for row, s in enumerate(sources):
+        lengths = dijkstra(graph, s, column)
+        cols = []
+        values = []
+        for v, d in lengths.items():
+            col = column.get(v)
+            if col is not None:
+                if d >= unreachable:
+                    raise OverflowError(f"distance {d} does not fit {distances.dtype}")
+                cols.append(col)
+                values.append(d)
+        distances[row, cols] = values
+
+
+@instrumented()
+def get_shortest_path_lengths_batch(
+    graph: BaseGraph,
+    sources: List[int],
+    vertices: Iterable[int],
+    batch_size: int = 256,
+    dtype: Optional[type] = None,
+) -> np.ndarray:
+    """
+    Кратчайшие расстояния от каждой из sources до вершин vertices
+
+    Источники обходятся пачками по batch_size одновременно, для взвешенного графа
+    расстояния считаются алгоритмом Дейкстры от каждого источника. Недостижимые пары
+    отмечены максимальным значением dtype (inf для float64).
+
+    :param dtype: Тип элементов матрицы, по умолчанию uint16 для невзвешенного графа,
+        uint32 для целых весов и float64 для дробных
+
+    :return: Матрица len(sources) x len(vertices), столбцы в порядке vertices
+    """
+    if dtype is None:
+        dtype = _distance_dtype(graph)
+    column = {v: i for i, v in enumerate(vertices)}
+    sources = list(sources)
+    distances = np.full((len(sources), len(column)), _unreachable(dtype), dtype=dtype)
+    if graph.is_weighted():
+        _fill_weighted_distances(graph, sources, column, distances)
+        return distances
+
+    for start in range(0, len(sources), batch_size):
+        batch = sources[start : start + batch_size]
+        _bit_parallel_bfs(graph, batch, column, distances[start : start + len(batch)])
+    return distances
+
+
+@dataclass(frozen=True)
+class Eccentricities:
+    """
+    Точные характеристики эксцентриситетов вершин компоненты
+
+    :param radius: Радиус
+    :param diameter: Диаметр
+    :param percentile: Процентиль эксцентриситета
+    :param bfs_runs: Число выполненных обходов в ширину
+    :param percentile_exact: Точен ли процентиль; False - границы не сошлись за
+        отведённое число обходов и процентиль оценён по случайным вершинам
+    """
+
+    radius: int
+    diameter: int
+    percentile: int
+    bfs_runs: int
+    percentile_exact: bool = True
+
+
+# traversals spent on the percentile before it is estimated by sampling
+PERCENTILE_RUNS = 50
+
+
+class _OrderStatistics:
+    """Мультимножество границ эксцентриситетов с порядковыми статистиками"""
+
+    __slots__ = ("_counts",)
+
+    def __init__(self):
+        self._counts = defaultdict(int)
+
+    def move(self, old: float, new: float, times: int = 1) -> None:
+        counts = self._counts
+        counts[old] -= times
+        if not counts[old]:
+            del counts[old]
+        counts[new] += times
+
+    def add(self, value: float, times: int = 1) -> None:
+        self._counts[value] += times
+
+    def select(self, ranks: Sequence[int]) -> List[float]:
+        """Значения с номерами ranks (по возрастанию) в отсортированном мультимножестве"""
+        values = []
+        seen = 0
+        pending = iter(sorted(ranks))
+        rank = next(pending, None)
+        for value in sorted(self._counts):
+            seen += self._counts[value]
+            while rank is not None and rank < seen:
+                values.append(value)
+                rank = next(pending, None)
+        return values
+
+
+@instrumented()
+def bounding_eccentricities(
+    graph: BaseGraph,
+    component: Iterable[int],
+    q: float = 0.9,
+    max_percentile_runs: int = PERCENTILE_RUNS,
+    k: int = 500,
+) -> Eccentricities:
+    """
+    Точный подсчёт радиуса, диаметра и процентиля эксцентриситета связной компоненты
+    методом ограничивающих эксцентриситетов (Takes, Kosters)
+
+    Обход из вершины v с эксцентриситетом e уточняет границы остальных вершин:
+    max(e - d(v, w), d(v, w)) <= ecc(w) <= e + d(v, w). Обходы выполняются поочерёдно
+    из вершины с наименьшей нижней и с наибольшей верхней границей, пока границы не
+    определят радиус и диаметр; для них на реальных графах требуется от нескольких
+    десятков до пары сотен обходов. Висячие вершины невзвешенного графа не обходятся:
+    их эксцентриситет на единицу больше, чем у соседа.
+
+    Процентиль сходится медленнее: эксцентриситеты большинства вершин совпадают, и
+    границы нужно свести почти у всех вершин. На него тратится не больше
+    max_percentile_runs обходов, после чего процентиль оценивается по k случайным
+    вершинам (уже известные эксцентриситеты не пересчитываются), а
+    percentile_exact равен False.
+    """
+    vertices = list(component)
+    members = set(vertices)
+
+    # a pendant vertex is always one step further than its only neighbour; with
+    # weights the farthest vertex from the neighbour may be the pendant itself
+    pendant_of = {}
+    if len(vertices) > 2 and not graph.is_weighted():
+        for v in vertices:
+            adjacent = {n for n in graph.neighbors[v] if n != v and n in members}
+            if len(adjacent) == 1:
+                pendant_of[v] = adjacent.pop()
+    core = [v for v in vertices if v not in pendant_of]
+    pendants = defaultdict(int)
+    for p in pendant_of.values():
+        pendants[p] += 1
+
+    lower = {v: 0 for v in core}
+    upper = {v: math.inf for v in core}
+    # bounds of every vertex, a pendant counts as its neighbour's bound plus one
+    lower_stats, upper_stats = _OrderStatistics(), _OrderStatistics()
+    lower_stats.add(0, len(core))
+    upper_stats.add(math.inf, len(vertices))
+    if pendant_of:
+        lower_stats.add(1, len(pendant_of))
+
+    def set_bounds(w: int, low: float, high: float) -> None:
+        if low != lower[w]:
+            lower_stats.move(lower[w], low)
+            if pendants[w]:
+                lower_stats.move(lower[w] + 1, low + 1, pendants[w])
+            lower[w] = low
+        if high != upper[w]:
+            upper_stats.move(upper[w], high)
+            if pendants[w]:
+                upper_stats.move(upper[w] + 1, high + 1, pendants[w])
+            upper[w] = high
+
+    degree = {v: len(graph.neighbors[v]) for v in core}
+    candidates = set(core)
+    ranks = (0, int(len(vertices) * q), len(vertices) - 1)
+    bfs_runs = percentile_runs = 0
+    turn = 0
+
+    while True:
+        low_min, low_rank, low_max = lower_stats.select(ranks)
+        high_min, high_rank, high_max = upper_stats.select(ranks)
+
+        # pick the next source for one of the statistics that is not fixed yet
+        strategies = []
+        if low_max != high_max:
+            strategies.append((lambda w: (upper[w], degree[w]), False))
+        if low_min != high_min:
+            strategies.append((lambda w: (-lower[w], degree[w]), False))
+        if low_rank != high_rank and percentile_runs < max_percentile_runs:
+            low, high = low_rank, high_rank
+
+            def straddles(w: int) -> bool:
+                return lower[w] < high and upper[w] > low
+
+            strategies.append((lambda w: (straddles(w), -lower[w], degree[w]), True))
+            strategies.append((lambda w: (straddles(w), upper[w], degree[w]), True))
+        if not strategies or not candidates:
+            break
+
+        key, for_percentile = strategies[turn % len(strategies)]
+        v = max(candidates, key=key)
+        turn += 1
+        percentile_runs += for_percentile
+
+        lengths = get_shortest_path_lengths(graph, v, vertices)
+        bfs_runs += 1
+        ecc = max(lengths.values())
+        set_bounds(v, ecc, ecc)
+        candidates.discard(v)
+
+        for w in list(candidates):
+            d = lengths[w]
+            set_bounds(w, max(lower[w], ecc - d, d), min(upper[w], ecc + d))
+            if lower[w] == upper[w]:
+                candidates.discard(w)
+
+    if low_rank == high_rank:
+        return Eccentricities(low_min, low_max, low_rank, bfs_runs)
+
+    # estimate the percentile on a sample, reusing the eccentricities already known
+    sample = random.sample(vertices, k=k) if len(vertices) > k else vertices
+    known = []
+    unknown = []
+    for v in sample:
+        w = pendant_of.get(v, v)
+        if lower[w] == upper[w]:
+            known.append(lower[w] + (w != v))
+        else:
+            unknown.append(v)
+    if unknown:
+        distances = get_shortest_path_lengths_batch(graph, unknown, vertices)
+        known += distances.max(axis=1).tolist()
+    known.sort()
+    return Eccentricities(
+        low_min, low_max, known[int(len(known) * q)], bfs_runs, percentile_exact=False
+    )
+
+
+def _sample_eccentricities(
+    shared: Tuple[BaseGraph, List[int]], sources: List[int]
+) -> np.ndarray:
+    graph, vertices = shared
+    return get_shortest_path_lengths_batch(graph, sources, vertices).max(axis=1)
+
+
+@instrumented()
 def evaluate_main_characteristics(
-    graph: BaseGraph, max_weak_comp: List[int], k: int = 500
-) -> Tuple[int, int, int]:
+    graph: BaseGraph,
+    max_weak_comp: Iterable[int],
+    k: int = 500,
+    exact: bool = False,
+    workers: int = 1,
+) -> Union[Tuple[int, int, int], Tuple[int, int, int, int]]:
     """
     Оценка значения радиуса, диаметра сети, 90 процентиля расстояния (геодезического) между вершинами графа
     на k случайных вершинах
+
+    При exact=True значения вычисляются по всей компоненте функцией
+    bounding_eccentricities, четвёртым элементом возвращается число выполненных обходов.
+    Радиус и диаметр точны, процентиль - если сошёлся за PERCENTILE_RUNS обходов,
+    иначе он оценивается по k случайным вершинам.
+    При workers > 1 обходы из случайных вершин распределяются между процессами.
     """
+    if exact:
+        eccentricities = bounding_eccentricities(graph, max_weak_comp, 0.9, k=k)
+        return (
+            eccentricities.radius,
+            eccentricities.diameter,
+            eccentricities.percentile,
+            eccentricities.bfs_runs,
+        )
 
+    max_weak_comp = list(max_weak_comp)
     random_vertices = (
         random.sample(max_weak_comp, k=k) if len(max_weak_comp) > k else max_weak_comp
     )
 
-    eccentricity = {}
-    for v in random_vertices:
-        path_lengths = get_shortest_path_lengths(graph, v, random_vertices)
-        eccentricity[v] = max(path_lengths.values())
+    eccentricity = np.sort(
+        np.concatenate(
+            parallel_map(
+                _sample_eccentricities,
+                (graph, random_vertices),
+                split(random_vertices, workers),
+                workers,
+            )
+        )
+    )
 
-    radius = min(eccentricity.values())
-    diameter = max(eccentricity.values())
-    percentile = sorted(eccentricity.values())[int(len(eccentricity) * 0.9)]
+    # item() keeps fractional eccentricities of weighted graphs
+    radius = eccentricity[0].item()
+    diameter = eccentricity[-1].item()
+    percentile = eccentricity[int(len(eccentricity) * 0.9)].item()
 
     return radius, diameter, percentile
 
 
+@instrumented()
 def evaluate_vertices_degree(graph: BaseGraph) -> Dict[int, list]:
     """
     Подсчёт вершин с определённой степенью
     """
+    table = degrees(graph)
     degree = defaultdict(list)
-    for v in graph.get_all_vertices():
-        degree[len(graph.neighbors[v])].append(v)
+    for v, d in zip(table.vertices, table.degrees.tolist()):
+        degree[d].append(v)
     return degree
 
 
+@instrumented()
 def num_of_triangles(graph: BaseGraph) -> int:
     """
     Подсчёт количества треугольников (полных подграфов на 3-х вершинах)
     """
-    marked_a = set()
-    triangles = 0
-    for a in graph.get_all_vertices():
-        marked_b = set()
-        marked_b.add(a)
-        for b in graph.neighbors[a]:
-            if b not in marked_a:
-                for c in graph.neighbors[b]:
-                    if (
-                        c not in marked_b
-                        and c not in marked_a
-                        and a in graph.neighbors[c]
-                    ):
-                        triangles += 1
-            marked_b.add(b)
-        marked_a.add(a)
-    return triangles
-
-
-def _edges_between_n(graph: BaseGraph, v: int) -> int:
-    """
-    Подсчёт количества рёбер между соседями вершины v
-    """
-    edges = set()
-    neigh = graph.neighbors[v]
-    for n in neigh:
-        for n_edge in graph.outgoing_adj_list[n]:
-            if n_edge.end in neigh:
-                edges.add(n_edge)
-        for n_edge in graph.incoming_adj_list[n]:
-            if n_edge.start in neigh:
-                edges.add(n_edge)
-    return len(edges)
+    return triangles(graph).total
 
 
 def _local_cluster_coefficient(graph: BaseGraph, v: int) -> float:
     """
     Вычисление локального кластерного коэффициента графа на вершине v
     """
-    degree = len(graph.neighbors[v])
+    counts = triangles(graph)
+    degree = counts.degrees[v]
     if degree < 2:
         return 0
 
-    e = _edges_between_n(graph, v)
-    return 2 * e / (degree * (degree - 1))
+    return 2 * counts.per_vertex[v] / (degree * (degree - 1))
+
 
+def _sample_wedge_closed(graph: BaseGraph, v: int) -> bool:
+    """Замкнута ли случайная вилка (пара различных соседей) с центром v"""
+    neighbors = graph.neighbors[v]
+    i, j = random.sample(range(len(neighbors)), 2)
+    a, b = neighbors[i], neighbors[j]
+    if a == b or v in (a, b):
+        return False
 
-def average_and_global_cluster_coefficients(graph: BaseGraph) -> Tuple[float, float]:
+    a_neighbors, b_neighbors = graph.neighbors[a], graph.neighbors[b]
+    if len(a_neighbors) > len(b_neighbors):
+        return a in b_neighbors
+    return b in a_neighbors
+
+
+@instrumented()
+def average_and_global_cluster_coefficients(
+    graph: BaseGraph,
+    approximate: bool = False,
+    epsilon: float = 0.01,
+    confidence: float = 0.99,
+) -> Tuple[float, float]:
     """
     Вычисление среднего и глобального кластерного коэффициента графа
+
+    Точные значения считаются по числам треугольников вершин из одного прохода triangles.
+    При approximate=True коэффициенты оцениваются по случайным вилкам (парам соседей
+    вершины): глобальный - по вилкам, выбранным равновероятно среди всех вилок графа,
+    средний - по одной случайной вилке у равновероятно выбранных вершин. Число выборок
+    по неравенству Хёфдинга гарантирует ошибку не больше epsilon с вероятностью
+    confidence. Оценка рассчитана на графы без кратных рёбер.
     """
-    sum_for_avg, sum_for_global, sum_of_comb = 0, 0, 0
-    vertices = graph.get_all_vertices()
-    for v in vertices:
-        local_coef = _local_cluster_coefficient(graph, v)
-        n = len(graph.neighbors[v])
-        combi = comb(n, 2, exact=True)
-
-        sum_for_avg += local_coef
-        sum_for_global += combi * local_coef
-        sum_of_comb += combi
-
-    average = sum_for_avg / len(vertices)
-    glob = sum_for_global / sum_of_comb
+    if approximate:
+        return _sampled_cluster_coefficients(graph, epsilon, confidence)
+
+    counts = triangles(graph)
+    sum_for_avg, wedges = 0.0, 0
+    for v, degree in counts.degrees.items():
+        pairs = degree * (degree - 1) // 2
+        if pairs:
+            sum_for_avg += counts.per_vertex[v] / pairs
+            wedges += pairs
+
+    average = sum_for_avg / len(counts.degrees)
+    glob = 3 * counts.total / wedges if wedges else 0.0
     return average, glob
 
 
+def _sampled_cluster_coefficients(
+    graph: BaseGraph, epsilon: float, confidence: float
+) -> Tuple[float, float]:
+    assert 0 < epsilon < 1 and 0 < confidence < 1
+
+    samples = math.ceil(math.log(2 / (1 - confidence)) / (2 * epsilon ** 2))
+    vertices = list(graph.get_all_vertices())
+    degrees = [len(graph.neighbors[v]) for v in vertices]
+
+    average_hits = 0
+    for i in random.choices(range(len(vertices)), k=samples):
+        if degrees[i] >= 2:
+            average_hits += _sample_wedge_closed(graph, vertices[i])
+
+    cum_wedges = list(accumulate(d * (d - 1) // 2 for d in degrees))
+    if not cum_wedges or not cum_wedges[-1]:
+        return average_hits / samples, 0.0
+    global_hits = sum(
+        _sample_wedge_closed(graph, v)
+        for v in random.choices(vertices, cum_weights=cum_wedges, k=samples)
+    )
+
+    return average_hits / samples, global_hits / samples
+
+
+@instrumented()
 def split_graph(
     graph: BaseGraph,
     weak_conns: List[Set[int]],
-) -> List[BaseGraph]:
+) -> List[SubgraphView]:
     """Union[UndirectedGraph, UndirectedWeightedGraph]
     Разделить граф по компонентам слабой связности
 
+    Компоненты возвращаются как SubgraphView: смежность не копируется, а фильтруется
+    по вершинам компоненты при обращении
+
     :param graph:
     :param weak_conns:
     """
     graphs = []
 
     for component in weak_conns:
-        graphs.__class__
-        new_graph = graph.__class__()
-        for vertex in component:
-            new_graph.outgoing_adj_list[vertex] = graph.outgoing_adj_list[vertex]
-            new_graph.incoming_adj_list[vertex] = graph.incoming_adj_list[vertex]
-            new_graph.neighbors[vertex] = graph.neighbors[vertex]
-        graphs.append(new_graph)
+        graphs.append(SubgraphView(graph, component))
 
     return graphs
 
 
+@instrumented("run_on_graphs.component")
+def _run_on_graph(
+    shared: Tuple[Callable[..., Any], List[BaseGraph], tuple, dict], index: int
+) -> Any:
+    func, graphs, args, kwargs = shared
+    graph = graphs[index]
+    record = current()
+    if record is not None:
+        record.params.update(
+            func=func.__qualname__, index=index, vertices=graph.num_vertices
+        )
+    return func(graph, *args, **kwargs)
+
+
+@instrumented()
 def run_on_graphs(
     func: Callable[[BaseGraph, Any], Any],
     graphs: List[Union[UndirectedGraph, UndirectedWeightedGraph]],
     adder: Callable[[Any, Any], Any],
     *args,
+    workers: int = 1,
+    verbose: bool = False,
     **kwargs,
 ) -> Any:
     """
     Запуск функции на множестве графов с последующим суммированием результата
 
+    Каждый граф обрабатывается инструментированным вызовом run_on_graphs.component,
+    поэтому ход вычислений виден через Profiler (при workers = 1).
+
     :param func: Целевая функция, результат которой необходимо узнать
     :param graphs: Множество графов, полученное функцией split_graph
     :param adder: Функция суммирования результата. Должна иметь сигнатуру
+    :param workers: Число процессов. Графы передаются процессам один раз,
+        результаты суммируются в исходном порядке графов
+    :param verbose: Печатать промежуточный результат после каждого графа
 
     def adder(result: Any, value: Any=None) -> Any:
         ...
     """
     result = None
-    for index, graph in enumerate(graphs):
-        print(
-            f">graph {index+1} of {len(graphs)}, size {graph.num_vertices}...", end=" "
-        )
-        val = func(graph, *args, **kwargs)
+    values = parallel_imap(
+        _run_on_graph, (func, graphs, args, kwargs), range(len(graphs)), workers
+    )
+    for index, (graph, val) in enumerate(zip(graphs, values)):
         if result is not None:
             result = adder(result, val)
         else:
             result = val
-        print(f"Pre-result: {result}")
+        if verbose:
+            print(
+                f">graph {index+1} of {len(graphs)}, size {graph.num_vertices}... "
+                f"Pre-result: {result}"
+            )
     return result
 
 
+def _largest_component_curve(graph: BaseGraph, order: Sequence[int]) -> List[int]:
+    """
+    Размер наибольшей компоненты слабой связности после удаления вершин в порядке order
+
+    Вершины возвращаются в граф в обратном порядке с объединением компонент в системе
+    непересекающихся множеств. Элемент k результата - размер наибольшей компоненты
+    среди последних k вершин порядка, то есть после удаления первых n - k вершин.
+    """
+    count_scanned(graph, order)
+    position = {v: i for i, v in enumerate(order)}
+    dsu = DisjointSet(len(order))
+    size = dsu.size
+    largest = 0
+    curve = [0]
+    for i in range(len(order) - 1, -1, -1):
+        root = i
+        for u in graph.neighbors[order[i]]:
+            # vertices after i in the order are already back in the graph
+            j = position.get(u)
+            if j is not None and j > i:
+                root = dsu.union(root, j)
+        if size[root] > largest:
+            largest = size[root]
+        curve.append(largest)
+    return curve
+
+
+@instrumented()
 def get_proportions_after_vertices_removal(
     graph: BaseGraph, step: float = 1.0, del_only_max_degree: bool = False
 ) -> Tuple[List[float], List[float]]:
+    """
+    Доля вершин в наибольшей компоненте слабой связности после удаления x% вершин
+
+    Порядок удаления фиксируется заранее: случайная перестановка вершин либо, при
+    del_only_max_degree, вершины по убыванию исходной степени. Вся кривая строится
+    за один проход обратной перколяции, исходный граф не изменяется.
+    """
     assert 0 < step < 100
 
-    graph_copy = graph
+    if del_only_max_degree:
+        order = degrees(graph).by_degree
+    else:
+        vertices = list(graph.get_all_vertices())
+        order = random.sample(vertices, k=len(vertices))
+    n = len(order)
+    curve = _largest_component_curve(graph, order)
 
     result_x = []
     result_y = []
     x = 0.0
     while x < 100:
-        all_vertices = list(graph_copy.get_all_vertices())
-
-        # delete needed number of vertices
-        percent_to_delete = (
-            0.0 if x == 0.0 else 1 - (1 - x / 100) / (1 - (x - step) / 100)
-        )
-        vertices_num_to_delete = int(len(all_vertices) * percent_to_delete)
-        if del_only_max_degree:
-            sorted_all_vertices = sorted(
-                all_vertices, key=lambda v: len(graph_copy.neighbors[v]), reverse=True
-            )
-            vertices_to_delete = sorted_all_vertices[:vertices_num_to_delete]
-        else:
-            vertices_to_delete = random.sample(all_vertices, k=vertices_num_to_delete)
-        graph_copy.delete_vertices(vertices_to_delete)
-
-        # add proportion
-
-        max_weak_comp = max_weak_conns_num(graph_copy)
+        remaining = n - int(n * x / 100)
         result_x.append(x)
-        result_y.append(max_weak_comp / graph_copy.num_vertices)
-
+        result_y.append(curve[remaining] / remaining if remaining else 0.0)
         x += step
 
     result_x.append(100.0)
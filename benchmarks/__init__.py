@@ -0,0 +1,20 @@
+from .generators import (
+    GENERATORS,
+    barabasi_albert,
+    build_graph,
+    erdos_renyi,
+    grid,
+    power_law_directed,
+)
+from .harness import Measurement, measure
+
+__all__ = [
+    "GENERATORS",
+    "barabasi_albert",
+    "build_graph",
+    "erdos_renyi",
+    "grid",
+    "power_law_directed",
+    "Measurement",
+    "measure",
+]
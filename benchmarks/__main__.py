@@ -0,0 +1,62 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict
+
+import numpy as np
+
+from benchmarks.generators import GENERATORS
+from benchmarks.suites import GRAPH_SUITES, loaders_suite
+
+SUITE_NAMES = list(GRAPH_SUITES) + ["loaders"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Замеры времени и памяти алгоритмов на синтетических графах",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument(
+        "--generators", nargs="+", choices=list(GENERATORS), default=list(GENERATORS)
+    )
+    parser.add_argument("--suites", nargs="+", choices=SUITE_NAMES, default=SUITE_NAMES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="-", help="JSON file, '-' for stdout")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        for suite in args.suites:
+            if suite == "loaders":
+                print(f"loaders n={n}", file=sys.stderr)
+                results.extend(loaders_suite(n, args.seed, args.repeat))
+                continue
+            for generator in args.generators:
+                print(f"{suite} {generator} n={n}", file=sys.stderr)
+                results.extend(GRAPH_SUITES[suite](generator, n, args.seed, args.repeat))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": [asdict(result) for result in results],
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import random
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+from models import (
+    BaseGraph,
+    DirectedGraph,
+    UndirectedGraph,
+    UndirectedWeightedGraph,
+    WeightedDirectedGraph,
+)
+
+EdgeList = Tuple[List[int], List[int], Optional[List[int]]]
+
+
+def _weights(rng: random.Random, count: int, max_weight: Optional[int]) -> Optional[List[int]]:
+    if max_weight is None:
+        return None
+    return [rng.randint(1, max_weight) for _ in range(count)]
+
+
+def build_graph(edges: EdgeList, directed: bool) -> BaseGraph:
+    """Граф подходящего класса из списка рёбер (начала, концы, веса или None)"""
+    starts, ends, weights = edges
+    if weights is None:
+        graph = DirectedGraph() if directed else UndirectedGraph()
+        graph.add_edges(starts, ends)
+    else:
+        graph = WeightedDirectedGraph() if directed else UndirectedWeightedGraph()
+        graph.add_edges(starts, ends, weights)
+    return graph
+
+
+def erdos_renyi_edges(
+    n: int,
+    average_degree: float = 8.0,
+    seed: int = 0,
+    directed: bool = False,
+    max_weight: Optional[int] = None,
+) -> EdgeList:
+    """
+    Случайный граф G(n, m) с m = n * average_degree / 2 рёбрами (n * average_degree
+    для ориентированного), петли отбрасываются
+    """
+    rng = random.Random(seed)
+    m = int(n * average_degree if directed else n * average_degree / 2)
+    starts, ends = [], []
+    while len(starts) < m:
+        a, b = rng.randrange(n), rng.randrange(n)
+        if a != b:
+            starts.append(a)
+            ends.append(b)
+    return starts, ends, _weights(rng, m, max_weight)
+
+
+def barabasi_albert_edges(
+    n: int, m: int = 4, seed: int = 0, max_weight: Optional[int] = None
+) -> EdgeList:
+    """Модель предпочтительного присоединения: каждая новая вершина соединяется с m вершинами"""
+    rng = random.Random(seed)
+    starts, ends = [], []
+    targets = list(range(m))
+    repeated = []
+    for source in range(m, n):
+        for target in targets:
+            starts.append(source)
+            ends.append(target)
+        repeated.extend(targets)
+        repeated.extend([source] * m)
+
+        chosen = set()
+        while len(chosen) < m:
+            chosen.add(rng.choice(repeated))
+        targets = list(chosen)
+    return starts, ends, _weights(rng, len(starts), max_weight)
+
+
+def grid_edges(
+    rows: int, cols: int, seed: int = 0, max_weight: Optional[int] = None
+) -> EdgeList:
+    """Решётка rows x cols, вершина (r, c) имеет номер r * cols + c"""
+    starts, ends = [], []
+    for r in range(rows):
+        for c in range(cols):
+            v = r * cols + c
+            if c + 1 < cols:
+                starts.append(v)
+                ends.append(v + 1)
+            if r + 1 < rows:
+                starts.append(v)
+                ends.append(v + cols)
+    return starts, ends, _weights(random.Random(seed), len(starts), max_weight)
+
+
+def power_law_directed_edges(
+    n: int,
+    average_degree: float = 8.0,
+    exponent: float = 2.5,
+    seed: int = 0,
+    max_weight: Optional[int] = None,
+) -> EdgeList:
+    """
+    Ориентированный граф Чунг-Лу со степенным распределением степеней
+
+    Концы рёбер выбираются независимо с вероятностью, пропорциональной
+    (i + 1) ^ (-1 / (exponent - 1)), петли отбрасываются.
+    """
+    rng = random.Random(seed)
+    cum_weights = list(
+        accumulate((i + 1) ** (-1 / (exponent - 1)) for i in range(n))
+    )
+    m = int(n * average_degree)
+    population = range(n)
+    starts, ends = [], []
+    while len(starts) < m:
+        need = m - len(starts)
+        for a, b in zip(
+            rng.choices(population, cum_weights=cum_weights, k=need),
+            rng.choices(population, cum_weights=cum_weights, k=need),
+        ):
+            if a != b:
+                starts.append(a)
+                ends.append(b)
+    return starts, ends, _weights(rng, m, max_weight)
+
+
+def erdos_renyi(n: int, seed: int = 0, **kwargs) -> BaseGraph:
+    return build_graph(
+        erdos_renyi_edges(n, seed=seed, **kwargs), kwargs.get("directed", False)
+    )
+
+
+def barabasi_albert(n: int, seed: int = 0, **kwargs) -> BaseGraph:
+    return build_graph(barabasi_albert_edges(n, seed=seed, **kwargs), False)
+
+
+def grid(n: int, seed: int = 0, **kwargs) -> BaseGraph:
+    """Квадратная решётка примерно на n вершин"""
+    side = max(1, round(n ** 0.5))
+    return build_graph(grid_edges(side, side, seed=seed, **kwargs), False)
+
+
+def power_law_directed(n: int, seed: int = 0, **kwargs) -> BaseGraph:
+    return build_graph(power_law_directed_edges(n, seed=seed, **kwargs), True)
+
+
+GENERATORS = {
+    "erdos_renyi": erdos_renyi,
+    "barabasi_albert": barabasi_albert,
+    "grid": grid,
+    "power_law_directed": power_law_directed,
+}
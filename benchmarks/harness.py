@@ -0,0 +1,68 @@
+import contextlib
+import io
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from algoritms import cache
+
+
+@dataclass
+class Measurement:
+    """
+    Результат замера одной функции
+
+    :param suite: Набор замеров (algorithms, loaders, landmarks)
+    :param name: Название замера
+    :param params: Параметры: генератор, размер графа и т.п.
+    :param seconds: Лучшее время из repeat запусков
+    :param repeat: Число запусков
+    :param peak_memory: Пик памяти, выделенной во время отдельного запуска, в байтах
+    :param extra: Дополнительные показатели, например пропускная способность
+    """
+
+    suite: str
+    name: str
+    params: Dict[str, Any]
+    seconds: float
+    repeat: int
+    peak_memory: int
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def measure(
+    suite: str,
+    name: str,
+    func: Callable[[], Any],
+    params: Dict[str, Any],
+    repeat: int = 3,
+    setup: Optional[Callable[[], None]] = cache.clear,
+) -> Measurement:
+    """
+    Замерить время и пик памяти вызова func()
+
+    Время измеряется без tracemalloc, который заметно замедляет выполнение, пик
+    памяти - в отдельном запуске. Перед каждым запуском вызывается setup, по
+    умолчанию сбрасывающий кеш результатов алгоритмов. Вывод func подавляется.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(suite, name, dict(params), min(times), repeat, peak)
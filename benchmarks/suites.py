@@ -0,0 +1,274 @@
+import operator
+import os
+import random
+import tempfile
+from typing import Callable, Dict, List
+
+import import_dataset
+from algoritms import (
+    average_and_global_cluster_coefficients,
+    bounding_eccentricities,
+    dijkstra,
+    evaluate_main_characteristics,
+    evaluate_vertices_degree,
+    get_proportions_after_vertices_removal,
+    get_shortest_path_lengths,
+    get_shortest_path_lengths_batch,
+    max_weak_conns_num,
+    num_of_triangles,
+    run_on_graphs,
+    shortest_distance,
+    split_graph,
+    strong_conns,
+    weak_conns,
+    weak_conns_num,
+)
+from algoritms.landmarks import (
+    LandmarksBasic,
+    LandmarksLCA,
+    PrunedLandmarkLabeling,
+    SelectLandmarksMethod,
+)
+from benchmarks.generators import (
+    GENERATORS,
+    erdos_renyi_edges,
+    power_law_directed_edges,
+)
+from benchmarks.harness import Measurement, measure
+
+SAMPLE_SOURCES = 64
+SAMPLE_PAIRS = 1000
+BATCH_PAIRS = 100_000
+LANDMARKS = 16
+
+
+def algorithms_suite(generator: str, n: int, seed: int, repeat: int) -> List[Measurement]:
+    """Замеры публичных функций algoritms.utils и точных запросов расстояний"""
+    graph = GENERATORS[generator](n, seed=seed)
+    rng = random.Random(seed)
+    component = max(weak_conns(graph), key=len)
+    members = sorted(component)
+    sources = rng.sample(members, min(SAMPLE_SOURCES, len(members)))
+    pairs = [(rng.choice(members), rng.choice(members)) for _ in range(SAMPLE_PAIRS)]
+    params = {
+        "generator": generator,
+        "vertices": graph.num_vertices,
+        "edges": graph.num_edges,
+    }
+
+    cases: Dict[str, Callable[[], object]] = {
+        "weak_conns": lambda: weak_conns(graph),
+        "weak_conns_num": lambda: weak_conns_num(graph),
+        "max_weak_conns_num": lambda: max_weak_conns_num(graph),
+        "strong_conns": lambda: strong_conns(graph),
+        "get_shortest_path_lengths": lambda: get_shortest_path_lengths(
+            graph, sources[0], members
+        ),
+        "get_shortest_path_lengths_batch": lambda: get_shortest_path_lengths_batch(
+            graph, sources, members
+        ),
+        "dijkstra": lambda: dijkstra(graph, sources[0]),
+        "shortest_distance": lambda: [shortest_distance(graph, s, t) for s, t in pairs],
+        "evaluate_main_characteristics": lambda: evaluate_main_characteristics(
+            graph, component, k=SAMPLE_SOURCES
+        ),
+        "evaluate_main_characteristics_exact": lambda: evaluate_main_characteristics(
+            graph, component, exact=True
+        ),
+        "bounding_eccentricities": lambda: bounding_eccentricities(graph, component),
+        "evaluate_vertices_degree": lambda: evaluate_vertices_degree(graph),
+        "num_of_triangles": lambda: num_of_triangles(graph),
+        "average_and_global_cluster_coefficients": lambda: (
+            average_and_global_cluster_coefficients(graph)
+        ),
+        "average_and_global_cluster_coefficients_approximate": lambda: (
+            average_and_global_cluster_coefficients(graph, approximate=True)
+        ),
+        "split_graph": lambda: split_graph(graph, weak_conns(graph)),
+        "run_on_graphs": lambda: run_on_graphs(
+            num_of_triangles, split_graph(graph, weak_conns(graph)), operator.add
+        ),
+        "get_proportions_after_vertices_removal": lambda: (
+            get_proportions_after_vertices_removal(graph)
+        ),
+        "get_proportions_after_vertices_removal_max_degree": lambda: (
+            get_proportions_after_vertices_removal(graph, del_only_max_degree=True)
+        ),
+    }
+
+    results = []
+    for name, func in cases.items():
+        result = measure("algorithms", name, func, params, repeat)
+        if name == "shortest_distance":
+            result.extra["queries_per_second"] = len(pairs) / result.seconds
+        results.append(result)
+    return results
+
+
+def _write_edge_list(path: str, starts, ends, weights=None, csv: bool = False) -> None:
+    with open(path, "w") as file:
+        if csv:
+            file.write("u,v,w,t\n")
+            for a, b, w in zip(starts, ends, weights):
+                file.write(f"{a},{b},{w},0\n")
+        else:
+            file.write("# benchmark edge list\n")
+            for a, b in zip(starts, ends):
+                file.write(f"{a}\t{b}\n")
+
+
+def loaders_suite(n: int, seed: int, repeat: int) -> List[Measurement]:
+    """
+    Замеры загрузчиков import_dataset на сгенерированных файлах
+
+    Каждый загрузчик замеряется при разборе текста, при первой загрузке с записью
+    бинарного кеша, при загрузке из кеша и при построении CSRGraph из кеша. Файлы
+    строятся из графов Эрдёша-Реньи (неориентированного и взвешенного) и степенного
+    ориентированного графа.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        files = {
+            "google_directed": os.path.join(directory, "google.txt"),
+            "ca_undirected": os.path.join(directory, "ca.txt"),
+            "vk_undirected": os.path.join(directory, "vk.csv"),
+        }
+        starts, ends, _ = power_law_directed_edges(n, seed=seed)
+        _write_edge_list(files["google_directed"], starts, ends)
+        starts, ends, _ = erdos_renyi_edges(n, seed=seed)
+        _write_edge_list(files["ca_undirected"], starts, ends)
+        starts, ends, weights = erdos_renyi_edges(n, seed=seed, max_weight=100)
+        _write_edge_list(files["vk_undirected"], starts, ends, weights, csv=True)
+
+        for loader_name, path in files.items():
+            loader = getattr(import_dataset, loader_name)
+            cache_path = path + import_dataset.CACHE_SUFFIX
+            params = {"vertices": n, "bytes": os.path.getsize(path)}
+
+            def drop_cache() -> None:
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+
+            results.append(
+                measure(
+                    "loaders",
+                    f"{loader_name}_text",
+                    lambda: loader(path, use_cache=False),
+                    params,
+                    repeat,
+                )
+            )
+            results.append(
+                measure(
+                    "loaders",
+                    f"{loader_name}_cache_build",
+                    lambda: loader(path),
+                    params,
+                    repeat,
+                    setup=drop_cache,
+                )
+            )
+            results.append(
+                measure(
+                    "loaders", f"{loader_name}_cached", lambda: loader(path), params, repeat
+                )
+            )
+            results.append(
+                measure(
+                    "loaders",
+                    f"{loader_name}_cached_csr",
+                    lambda: loader(path, csr=True),
+                    params,
+                    repeat,
+                )
+            )
+    return results
+
+
+def landmarks_suite(generator: str, n: int, seed: int, repeat: int) -> List[Measurement]:
+    """Замеры подготовки, сохранения, загрузки и запросов оракулов на ориентирах"""
+    graph = GENERATORS[generator](n, seed=seed)
+    rng = random.Random(seed)
+    vertices = sorted(graph.get_all_vertices())
+    pairs = [(rng.choice(vertices), rng.choice(vertices)) for _ in range(SAMPLE_PAIRS)]
+    batch = [(rng.choice(vertices), rng.choice(vertices)) for _ in range(BATCH_PAIRS)]
+    params = {
+        "generator": generator,
+        "vertices": graph.num_vertices,
+        "edges": graph.num_edges,
+        "landmarks": LANDMARKS,
+    }
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for cls in (LandmarksBasic, LandmarksLCA):
+            name = cls.__name__
+            results.append(
+                measure(
+                    "landmarks",
+                    f"{name}_prepare",
+                    lambda: cls(graph, LANDMARKS, SelectLandmarksMethod.MAX_DEGREE),
+                    params,
+                    repeat,
+                )
+            )
+            oracle = cls(graph, LANDMARKS, SelectLandmarksMethod.MAX_DEGREE)
+            path = os.path.join(directory, f"{name}.landmarks")
+            results.append(
+                measure("landmarks", f"{name}_save", lambda: oracle.save(path), params, repeat)
+            )
+            results.append(
+                measure(
+                    "landmarks", f"{name}_load", lambda: cls.load(path, graph), params, repeat
+                )
+            )
+
+            queries = {
+                "distance": (lambda: [oracle.distance(s, t) for s, t in pairs], pairs),
+                "distance_many": (lambda: oracle.distance_many(batch), batch),
+                "exact_distance": (
+                    lambda: [oracle.exact_distance(s, t) for s, t in pairs[:100]],
+                    pairs[:100],
+                ),
+            }
+            for query, (func, query_pairs) in queries.items():
+                result = measure("landmarks", f"{name}_{query}", func, params, repeat)
+                result.extra["queries_per_second"] = len(query_pairs) / result.seconds
+                results.append(result)
+
+        name = PrunedLandmarkLabeling.__name__
+        prepare = measure(
+            "landmarks", f"{name}_prepare", lambda: PrunedLandmarkLabeling(graph), params, repeat
+        )
+        labeling = PrunedLandmarkLabeling(graph)
+        prepare.extra.update(labeling.index_size)
+        results.append(prepare)
+        path = os.path.join(directory, f"{name}.landmarks")
+        results.append(
+            measure("landmarks", f"{name}_save", lambda: labeling.save(path), params, repeat)
+        )
+        results.append(
+            measure(
+                "landmarks",
+                f"{name}_load",
+                lambda: PrunedLandmarkLabeling.load(path, graph),
+                params,
+                repeat,
+            )
+        )
+        queries = {
+            "distance": (lambda: [labeling.distance(s, t) for s, t in pairs], pairs),
+            "distance_many": (lambda: labeling.distance_many(batch), batch),
+        }
+        for query, (func, query_pairs) in queries.items():
+            result = measure("landmarks", f"{name}_{query}", func, params, repeat)
+            result.extra["queries_per_second"] = len(query_pairs) / result.seconds
+            results.append(result)
+    return results
+
+
+# suites run for every generator; loaders_suite builds its own files
+GRAPH_SUITES = {
+    "algorithms": algorithms_suite,
+    "landmarks": landmarks_suite,
+}
@@ -1,47 +1,292 @@
-from models import DirectedGraph, UndirectedGraph, UndirectedWeightedGraph
-import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterator, List, Optional, Tuple, Union
 
+from models import (
+    CSRGraph,
+    DirectedGraph,
+    UndirectedGraph,
+    UndirectedWeightedGraph,
+)
 
-def google_directed(filename: str) -> DirectedGraph:
-    graph = DirectedGraph()
+CHUNK_SIZE = 1 << 20
 
-    with open(filename, "r") as file:
-        for l in file.readlines():
-            if l[0] == "#":
-                continue
-            new_line = l.strip()
-            try:
-                u, v = new_line.split("\t")
-            except ValueError:
-                u, v = new_line.split(" ")
-            graph.add_edge(int(u), int(v))
-    return graph
+CACHE_SUFFIX = ".edgecache"
+_CACHE_MAGIC = b"GRPHEDGE"
+_CACHE_VERSION = 2
+# magic, version, byte order, skip_header, number of columns, fields per line,
+# source mtime (ns), source size, edges
+_CACHE_HEADER = struct.Struct("<8sIBBxxIIqqq")
+_ITEM_SIZE = array("q").itemsize
 
+EdgeChunk = Tuple[array, ...]
 
-def ca_undirected(filename: str) -> UndirectedGraph:
-    graph = UndirectedGraph()
 
+def _parse_text_chunks(
+    filename: str, fields: int, columns: int, skip_header: bool, chunk_size: int
+) -> Iterator[EdgeChunk]:
+    """
+    Разбор текстового файла блоками примерно по chunk_size байт
+
+    Строка с числом полей, отличным от fields, приводит к ValueError. Как и прежний
+    разбор CSV, допускаются пустые поля в конце строки (1,2,3,), если это не одно из
+    первых columns полей.
+    """
     with open(filename, "r") as file:
-        for l in file.readlines():
-            if l[0] == "#":
-                continue
-            new_line = l.strip()
-            if '\t' in new_line:
-                u, v = new_line.split("\t")
+        line_number = 0
+        if skip_header:
+            file.readline()
+            line_number += 1
+        while True:
+            lines = file.readlines(chunk_size)
+            if not lines:
+                break
+            text = "".join(l for l in lines if l[0] != "#").replace(",", " ")
+            # a short line would shift every following field of the flat token list
+            if set(map(len, map(str.split, text.splitlines()))) <= {0, fields}:
+                tokens = text.split()
+                chunk = [tokens[i::fields] for i in range(columns)]
             else:
-                u, v = new_line.split(" ")
-            graph.add_edge(int(u), int(v))
+                rows = _parse_lines(filename, lines, line_number, fields, columns)
+                chunk = list(zip(*rows)) or [()] * columns
+            line_number += len(lines)
+            yield tuple(array("q", map(int, column)) for column in chunk)
+
+
+def _parse_lines(
+    filename: str, lines: List[str], skipped: int, fields: int, columns: int
+) -> List[List[str]]:
+    """Первые columns полей каждой строки блока с проверкой числа полей"""
+    rows = []
+    for number, line in enumerate(lines, skipped + 1):
+        if line[0] == "#":
+            continue
+        tokens = line.replace(",", " ").split()
+        if not tokens:
+            continue
+        count = len(tokens)
+        if count != fields and "," in line:
+            parts = line.strip().split(",")
+            # empty trailing fields, which the csv reader used to keep as ""
+            if len(parts) == fields and not any(parts[count:]) and count >= columns:
+                count = fields
+        if count != fields:
+            raise ValueError(
+                f"{filename}:{number}: expected {fields} fields, got {count}"
+            )
+        rows.append(tokens[:columns])
+    return rows
+
+
+def _cache_path(filename: str) -> str:
+    return filename + CACHE_SUFFIX
+
+
+def _read_cache(
+    path: str,
+    source: os.stat_result,
+    fields: int,
+    columns: int,
+    skip_header: bool,
+    chunk_size: int,
+) -> Optional[Iterator[EdgeChunk]]:
+    """
+    Блоки рёбер из кеша или None, если кеш отсутствует, устарел или был построен
+    с другими параметрами разбора
+    """
+    try:
+        file = open(path, "rb")
+    except OSError:
+        return None
+
+    with file:
+        header = file.read(_CACHE_HEADER.size)
+        if len(header) != _CACHE_HEADER.size:
+            return None
+        (
+            magic,
+            version,
+            little,
+            cached_skip_header,
+            cached_columns,
+            cached_fields,
+            mtime,
+            size,
+            count,
+        ) = _CACHE_HEADER.unpack(header)
+        if (
+            magic != _CACHE_MAGIC
+            or version != _CACHE_VERSION
+            or bool(little) != (sys.byteorder == "little")
+            or cached_columns != columns
+            or cached_fields != fields
+            or bool(cached_skip_header) != skip_header
+            or mtime != source.st_mtime_ns
+            or size != source.st_size
+            or os.fstat(file.fileno()).st_size
+            != _CACHE_HEADER.size + count * columns * _ITEM_SIZE
+        ):
+            return None
+        if count == 0:
+            return iter(())
+        cache = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return _iter_cache(cache, columns, count, chunk_size)
+
+
+def _iter_cache(
+    cache: mmap.mmap, columns: int, count: int, chunk_size: int
+) -> Iterator[EdgeChunk]:
+    step = max(1, chunk_size // (columns * _ITEM_SIZE))
+    try:
+        with memoryview(cache) as view:
+            for start in range(0, count, step):
+                end = min(start + step, count)
+                chunk = []
+                for column in range(columns):
+                    offset = _CACHE_HEADER.size + (column * count) * _ITEM_SIZE
+                    with view[
+                        offset + start * _ITEM_SIZE : offset + end * _ITEM_SIZE
+                    ] as part:
+                        chunk.append(array("q", part.tobytes()))
+                yield tuple(chunk)
+    finally:
+        cache.close()
+
+
+def _write_cache(
+    path: str,
+    source: os.stat_result,
+    fields: int,
+    skip_header: bool,
+    collected: Tuple[array, ...],
+) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(
+                _CACHE_HEADER.pack(
+                    _CACHE_MAGIC,
+                    _CACHE_VERSION,
+                    sys.byteorder == "little",
+                    skip_header,
+                    len(collected),
+                    fields,
+                    source.st_mtime_ns,
+                    source.st_size,
+                    len(collected[0]),
+                )
+            )
+            for column in collected:
+                column.tofile(file)
+        os.replace(tmp_path, path)
+    except OSError:
+        # the dataset directory may be read-only, the cache is optional
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def iter_edge_chunks(
+    filename: str,
+    fields: int = 2,
+    columns: int = 2,
+    skip_header: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    use_cache: bool = True,
+) -> Iterator[EdgeChunk]:
+    """
+    Потоковое чтение списка рёбер блоками
+
+    При первом полном чтении рядом с файлом сохраняется бинарный кеш рёбер,
+    последующие чтения отображают его в память вместо разбора текста.
+    Кеш сбрасывается при изменении времени модификации или размера файла, а также
+    не используется при других fields, columns или skip_header.
+
+    :param filename: Путь к файлу со списком рёбер
+    :param fields: Число полей в строке файла
+    :param columns: Число первых полей строки, которые нужно прочитать
+    :param skip_header: Пропустить первую строку файла
+    :param chunk_size: Примерный размер блока в байтах
+    :param use_cache: Использовать бинарный кеш
+    :return: Кортежи массивов (начала, концы, ...) для каждого блока
+    """
+    if not use_cache:
+        yield from _parse_text_chunks(
+            filename, fields, columns, skip_header, chunk_size
+        )
+        return
+
+    source = os.stat(filename)
+    cache_path = _cache_path(filename)
+    cached = _read_cache(
+        cache_path, source, fields, columns, skip_header, chunk_size
+    )
+    if cached is not None:
+        yield from cached
+        return
+
+    collected = tuple(array("q") for _ in range(columns))
+    for chunk in _parse_text_chunks(filename, fields, columns, skip_header, chunk_size):
+        for column, values in zip(collected, chunk):
+            column.extend(values)
+        yield chunk
+    _write_cache(cache_path, source, fields, skip_header, collected)
+
+
+def _collect(chunks: Iterator[EdgeChunk], columns: int) -> Tuple[array, ...]:
+    """
+    Склеить блоки в столбцы; рёбра добавляются в граф одной пачкой, чтобы
+    не сверять каждый следующий блок с уже построенными списками смежности
+    """
+    collected = tuple(array("q") for _ in range(columns))
+    for chunk in chunks:
+        for column, values in zip(collected, chunk):
+            column.extend(values)
+    return collected
+
+
+def _load_csr(chunks: Iterator[EdgeChunk], columns: int, directed: bool) -> CSRGraph:
+    collected = _collect(chunks, columns)
+    weights = collected[2] if columns > 2 else None
+    return CSRGraph.from_edges(collected[0], collected[1], weights, directed=directed)
+
+
+def google_directed(
+    filename: str, csr: bool = False, use_cache: bool = True
+) -> Union[DirectedGraph, CSRGraph]:
+    chunks = iter_edge_chunks(filename, use_cache=use_cache)
+    if csr:
+        return _load_csr(chunks, 2, directed=True)
+
+    graph = DirectedGraph()
+    graph.add_edges(*_collect(chunks, 2))
     return graph
 
 
-def vk_undirected(filename: str):
-    graph = UndirectedWeightedGraph()
+def ca_undirected(
+    filename: str, csr: bool = False, use_cache: bool = True
+) -> Union[UndirectedGraph, CSRGraph]:
+    chunks = iter_edge_chunks(filename, use_cache=use_cache)
+    if csr:
+        return _load_csr(chunks, 2, directed=False)
+
+    graph = UndirectedGraph()
+    graph.add_edges(*_collect(chunks, 2))
+    return graph
 
-    with open(filename, newline="") as csvfile:
-        reader = csv.reader(csvfile, delimiter=" ", quotechar="|")
-        next(reader)
-        for row in reader:
-            u, v, t, h = "".join(row).split(",")
-            graph.add_edge(int(u), int(v), int(t))
 
+def vk_undirected(
+    filename: str, csr: bool = False, use_cache: bool = True
+) -> Union[UndirectedWeightedGraph, CSRGraph]:
+    chunks = iter_edge_chunks(
+        filename, fields=4, columns=3, skip_header=True, use_cache=use_cache
+    )
+    if csr:
+        return _load_csr(chunks, 3, directed=False)
+
+    graph = UndirectedWeightedGraph()
+    graph.add_edges(*_collect(chunks, 3))
     return graph
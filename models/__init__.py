@@ -4,7 +4,9 @@ from .graphs import (
     UndirectedWeightedGraph,
     UndirectedGraph,
     DirectedGraph,
-    WeightedDirectedGraph
+    WeightedDirectedGraph,
+    CSRGraph,
+    SubgraphView,
 )
 
 __all__ = [
@@ -15,4 +17,6 @@ __all__ = [
     "UndirectedGraph",
     "DirectedGraph",
     "WeightedDirectedGraph",
+    "CSRGraph",
+    "SubgraphView",
 ]
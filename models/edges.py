@@ -1,6 +1,36 @@
 from dataclasses import dataclass
 from typing import Tuple
 
+import numpy as np
+
+# vertex ids below 2 ** 32 map to distinct keys
+_KEY_SHIFT = 32
+_KEY_MASK = (1 << _KEY_SHIFT) - 1
+
+
+def edge_key(start: int, end: int) -> int:
+    """Ключ неориентированного ребра: меньший конец в старших 32 битах, больший - в младших"""
+    if start > end:
+        start, end = end, start
+    return (start << _KEY_SHIFT) | (end & _KEY_MASK)
+
+
+def edge_keys(starts: np.ndarray, ends: np.ndarray, directed: bool) -> np.ndarray:
+    """
+    Ключи рёбер массивами uint64, для неориентированных рёбер порядок концов не важен
+
+    Вершины должны лежать в диапазоне [0, 2 ** 32), иначе бросается ValueError.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if len(starts) and (
+        min(starts.min(), ends.min()) < 0 or max(starts.max(), ends.max()) > _KEY_MASK
+    ):
+        raise ValueError("vertex ids must be in [0, 2 ** 32) to pack edge keys")
+    if not directed:
+        starts, ends = np.minimum(starts, ends), np.maximum(starts, ends)
+    return (starts.astype(np.uint64) << np.uint64(_KEY_SHIFT)) | ends.astype(np.uint64)
+
 
 @dataclass
 class Edge:
@@ -12,10 +42,7 @@ class Edge:
         return str(self.start), str(self.end)
 
     def __hash__(self):
-        if self.start > self.end:
-            return hash(f"{self.start} {self.end}")
-        else:
-            return hash(f"{self.end} {self.start}")
+        return edge_key(self.start, self.end)
 
     def __eq__(self, other):
         return (
@@ -35,10 +62,7 @@ class WeightedEdge(Edge):
         return str(self.start), str(self.end), float(self.weight)
 
     def __hash__(self):
-        if self.start > self.end:
-            return hash(f"{self.start} {self.end}")
-        else:
-            return hash(f"{self.end} {self.start}")
+        return edge_key(self.start, self.end)
 
     def __eq__(self, other):
         return (
@@ -1,4 +1,6 @@
 from .base_graph import BaseGraph
+from .csr_graph import CSRGraph
+from .subgraph_view import SubgraphView
 from .directed_graph import DirectedGraph, WeightedDirectedGraph
 from .undirected_graph import UndirectedGraph, UndirectedWeightedGraph
 
@@ -8,4 +10,6 @@ __all__ = [
     "UndirectedGraph",
     "DirectedGraph",
     "WeightedDirectedGraph",
+    "CSRGraph",
+    "SubgraphView",
 ]
@@ -0,0 +1,129 @@
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Union
+
+
+class AdjacencyRow(list):
+    """
+    Список смежности вершины с индексом позиций по соседу
+
+    Это обычный список, который строится, индексируется и обходится так же быстро и
+    занимает столько же памяти. Индекс позиций элементов по соседу строится лениво:
+    при первом удалении или при первой проверке соседства в длинной строке. С ним
+    проверка соседства и удаление выполняются за O(1): удаляемый элемент заменяется
+    последним. Изменять строку можно только через append, extend и remove_key.
+    Кратные рёбра сохраняются.
+    """
+
+    # the index is unset until the first query that needs it
+    __slots__ = ("_positions",)
+
+    # neighbour vertex that indexes an item of the row
+    _key = staticmethod(lambda item: item)
+    # shorter rows answer membership queries by a scan instead of building the index
+    _SCAN_LIMIT = 16
+
+    def __contains__(self, item) -> bool:
+        positions = getattr(self, "_positions", None)
+        if positions is None and len(self) <= self._SCAN_LIMIT:
+            return list.__contains__(self, item)
+        current = self._index().get(self._key(item))
+        if current is None:
+            return False
+        if isinstance(current, int):
+            return self[current] == item
+        return any(self[pos] == item for pos in current)
+
+    def __getstate__(self):
+        # copies rebuild the index on demand, their items are appended after the state
+        return None
+
+    def _index(self) -> Dict[int, Union[int, List[int]]]:
+        positions = getattr(self, "_positions", None)
+        if positions is None:
+            positions = self._positions = {}
+            self._add_positions(self, 0)
+        return positions
+
+    def _add_positions(self, items: Iterable[Any], start: int) -> None:
+        positions = self._positions
+        for pos, key in enumerate(map(self._key, items), start):
+            # a single position is stored as int, lists appear only for multi-edges
+            current = positions.setdefault(key, pos)
+            if current == pos:
+                continue
+            if isinstance(current, int):
+                positions[key] = [current, pos]
+            else:
+                current.append(pos)
+
+    def append(self, item: Any) -> None:
+        list.append(self, item)
+        if getattr(self, "_positions", None) is not None:
+            self._add_positions((item,), len(self) - 1)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        start = len(self)
+        list.extend(self, items)
+        if getattr(self, "_positions", None) is not None:
+            self._add_positions(self[start:], start)
+
+    def remove_key(self, key: int) -> Any:
+        """Удалить один элемент, ведущий к соседу key, и вернуть его"""
+        positions = self._index()
+        current = positions[key]
+        if isinstance(current, int):
+            pos = current
+            del positions[key]
+        else:
+            pos = current.pop()
+            if len(current) == 1:
+                positions[key] = current[0]
+
+        removed = self[pos]
+        last = list.pop(self)
+        if pos != len(self):
+            self[pos] = last
+            self._move(self._key(last), len(self), pos)
+        return removed
+
+    def _move(self, key: int, old: int, new: int) -> None:
+        current = self._positions[key]
+        if isinstance(current, int):
+            self._positions[key] = new
+        else:
+            current[current.index(old)] = new
+
+    def count(self, key: int) -> int:
+        """Число элементов, ведущих к соседу key"""
+        if getattr(self, "_positions", None) is None and len(self) <= self._SCAN_LIMIT:
+            return sum(1 for k in map(self._key, self) if k == key)
+        current = self._index().get(key)
+        if current is None:
+            return 0
+        return 1 if isinstance(current, int) else len(current)
+
+    def keys(self):
+        """Различные соседи"""
+        positions = getattr(self, "_positions", None)
+        if positions is None:
+            return dict.fromkeys(map(self._key, self)).keys()
+        return positions.keys()
+
+    def copy(self) -> List[Any]:
+        return list(self)
+
+
+class OutgoingRow(AdjacencyRow):
+    """Исходящие рёбра вершины, индексированные по концу"""
+
+    __slots__ = ()
+
+    _key = attrgetter("end")
+
+
+class IncomingRow(AdjacencyRow):
+    """Входящие рёбра вершины, индексированные по началу"""
+
+    __slots__ = ()
+
+    _key = attrgetter("start")
@@ -1,18 +1,110 @@
 import copy
 from collections import defaultdict
-from typing import List, Union, Set, Dict
+from typing import Any, Iterable, List, Optional, Union, Set, Dict, Tuple
 
-from models.edges import Edge, WeightedEdge
+import numpy as np
+
+from models.edges import Edge, WeightedEdge, edge_keys
+from models.graphs.adjacency import AdjacencyRow, IncomingRow, OutgoingRow
 
 
 class BaseGraph:
-    __slots__ = ("num_edges", "outgoing_adj_list", "incoming_adj_list", "neighbors")
+    __slots__ = (
+        "num_edges",
+        "outgoing_adj_list",
+        "incoming_adj_list",
+        "neighbors",
+        "_version",
+        "_vertex_set",
+        "__weakref__",
+    )
 
     def __init__(self):
         self.num_edges = 0
-        self.outgoing_adj_list = defaultdict(list)
-        self.incoming_adj_list = defaultdict(list)
-        self.neighbors = defaultdict(list)
+        self._version = 0
+        # (version, vertices) computed by get_all_vertices
+        self._vertex_set = None
+        self.outgoing_adj_list = defaultdict(OutgoingRow)
+        self.incoming_adj_list = defaultdict(IncomingRow)
+        self.neighbors = defaultdict(AdjacencyRow)
+
+    @property
+    def version(self) -> int:
+        """
+        Номер версии графа, увеличивается при каждом изменении через методы графа
+
+        По нему сбрасываются сохранённые производные результаты (множество вершин,
+        компоненты, таблицы ориентиров и т.п.). Прямое изменение списков смежности
+        версию не меняет.
+        """
+        return self._version
+
+    def _changed(self) -> None:
+        self._version += 1
+
+    def has_edge(self, _from: int, _to: int) -> bool:
+        """Есть ли ребро _from -> _to, для строк AdjacencyRow за O(1)"""
+        outgoing = self.outgoing_adj_list
+        if _from not in outgoing:
+            return False
+        row = outgoing[_from]
+        if isinstance(row, AdjacencyRow):
+            return row.count(_to) > 0
+        return any(edge.end == _to for edge in row)
+
+    def _add_edge_arrays(
+        self,
+        starts: Iterable[int],
+        ends: Iterable[int],
+        weights: Optional[Iterable[int]] = None,
+    ) -> None:
+        """
+        Добавить рёбра пачкой без повторов
+
+        Повторы внутри пачки отбрасываются сортировкой упакованных ключей рёбер: остаётся
+        первое вхождение с наименьшим из весов повторов. Рёбра, которые уже есть в
+        графе, не добавляются и не меняются. Рёбра группируются по вершине одной
+        сортировкой, и каждая строка смежности создаётся или дополняется один раз.
+        """
+        directed = self.is_directed()
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if weights is not None:
+            weights = np.asarray(weights)
+        first, weights = _unique_edges(starts, ends, weights, directed)
+        starts, ends = starts[first], ends[first]
+
+        outgoing = self.outgoing_adj_list
+        # a new graph (the loaders' case) has nothing to compare against
+        if outgoing:
+            keep = _new_edges(outgoing, starts.tolist(), ends.tolist())
+            if len(keep) < len(starts):
+                starts, ends = starts[keep], ends[keep]
+                if weights is not None:
+                    weights = weights[keep]
+        if not len(starts):
+            return
+        self._changed()
+
+        start_list, end_list = starts.tolist(), ends.tolist()
+        if weights is None:
+            edges = list(map(Edge, start_list, end_list))
+        else:
+            weight_list = weights.tolist()
+            edges = list(map(WeightedEdge, start_list, end_list, weight_list))
+        both = start_list + end_list
+        if directed:
+            _extend_rows(outgoing, start_list, edges)
+            _extend_rows(self.incoming_adj_list, end_list, edges)
+            self.num_edges += len(edges)
+        else:
+            if weights is None:
+                edges += map(Edge, end_list, start_list)
+            else:
+                edges += map(WeightedEdge, end_list, start_list, weight_list)
+            _extend_rows(outgoing, both, edges)
+            self.num_edges += len(edges)
+        _extend_rows(self.neighbors, both, end_list + start_list)
 
     def get_all_edges_of(self, v: int) -> List[Union[Edge, WeightedEdge]]:
         """Get all edges connected v"""
@@ -25,9 +117,16 @@ class BaseGraph:
         ]
 
     def get_all_vertices(self) -> Set[int]:
-        return set(self.outgoing_adj_list.keys()).union(
-            set(self.incoming_adj_list.keys())
-        )
+        """Множество вершин (копия), пересчитывается только после изменения графа"""
+        return set(self._vertices())
+
+    def _vertices(self) -> frozenset:
+        if self._vertex_set is None or self._vertex_set[0] != self._version:
+            vertices = frozenset(self.outgoing_adj_list.keys()).union(
+                self.incoming_adj_list.keys()
+            )
+            self._vertex_set = (self._version, vertices)
+        return self._vertex_set[1]
 
     def is_weighted(self):
         raise NotImplementedError()
@@ -36,38 +135,78 @@ class BaseGraph:
         raise NotImplementedError()
 
     def delete_vertex(self, v: int) -> None:
-        if not self.is_directed():
-            del self.outgoing_adj_list[v]
-            return
+        self.delete_vertices([v])
 
-        end_vertices = []
-        while self.outgoing_adj_list[v]:
-            end_vertices.append(self.outgoing_adj_list[v][0].end)
-            self.outgoing_adj_list[v].pop(0)
+    def delete_vertices(self, vertices_to_delete: Iterable[int]) -> None:
+        """
+        Удалить вершины вместе с инцидентными рёбрами за O(суммы их степеней)
 
-        for end in end_vertices:
-            idx = [
-                idx for idx, x in enumerate(self.incoming_adj_list[end]) if x.start == v
-            ][0]
-            self.incoming_adj_list[end].pop(idx)
+        Рёбра удаляются из списков смежности оставшихся вершин и из neighbors,
+        num_edges уменьшается на число удалённых рёбер.
+        """
+        outgoing, incoming, neighbors = (
+            self.outgoing_adj_list,
+            self.incoming_adj_list,
+            self.neighbors,
+        )
+        directed = self.is_directed()
+        deleted = {v for v in vertices_to_delete if v in outgoing or v in incoming}
+        if deleted:
+            self._changed()
+
+        removed = 0
+        for v in deleted:
+            out_row = outgoing.pop(v, ())
+            removed += len(out_row)
+            for edge in out_row:
+                u = edge.end
+                # rows of deleted vertices are dropped as a whole
+                if u in deleted:
+                    continue
+                if directed:
+                    incoming[u].remove_key(v)
+                else:
+                    outgoing[u].remove_key(v)
+                    removed += 1
+                neighbors[u].remove_key(v)
+
+            for edge in incoming.pop(v, ()):
+                u = edge.start
+                if u in deleted:
+                    continue
+                outgoing[u].remove_key(v)
+                neighbors[u].remove_key(v)
+                removed += 1
+
+            neighbors.pop(v, None)
 
-        start_vertices = []
-        while self.incoming_adj_list[v]:
-            start_vertices.append(self.incoming_adj_list[v][0].start)
-            self.incoming_adj_list[v].pop(0)
+        self.num_edges -= removed
 
-        for start in start_vertices:
-            idx = [
-                idx for idx, x in enumerate(self.outgoing_adj_list[start]) if x.end == v
-            ][0]
-            self.outgoing_adj_list[start].pop(idx)
+    def delete_edge(self, _from: int, _to: int) -> None:
+        """
+        Удалить одно ребро _from -> _to за O(1)
 
-        del self.outgoing_adj_list[v]
-        del self.incoming_adj_list[v]
+        В неориентированном графе удаляются обе записи ребра. Если ребра нет,
+        бросается KeyError.
+        """
+        outgoing, neighbors = self.outgoing_adj_list, self.neighbors
+        if _from not in outgoing or not outgoing[_from].count(_to):
+            raise KeyError((_from, _to))
+        self._changed()
 
-    def delete_vertices(self, vertices_to_delete: List[int]):
-        for v in vertices_to_delete:
-            self.delete_vertex(v)
+        outgoing[_from].remove_key(_to)
+        if self.is_directed():
+            self.incoming_adj_list[_to].remove_key(_from)
+            self.num_edges -= 1
+        else:
+            outgoing[_to].remove_key(_from)
+            self.num_edges -= 2
+        neighbors[_from].remove_key(_to)
+        neighbors[_to].remove_key(_from)
+
+    def delete_edges(self, edges: Iterable[Tuple[int, int]]) -> None:
+        for _from, _to in edges:
+            self.delete_edge(_from, _to)
 
     def out_vertices_by_priority(self, v: int, priority: Dict[int, int] = None):
         new_edges = sorted(
@@ -84,13 +223,91 @@ class BaseGraph:
 
     @property
     def num_vertices(self):
-        return len(self.get_all_vertices())
+        return len(self._vertices())
 
     def __getitem__(self, key):
-        return set(self.outgoing_adj_list[key]).update(self.incoming_adj_list[key])
+        return set(self.outgoing_adj_list[key]).union(self.incoming_adj_list[key])
 
     def __deepcopy__(self, memodict={}):
         graph_copy = self.__class__()
         for s in self.__slots__:
+            if s == "__weakref__":
+                continue
             setattr(graph_copy, s, copy.deepcopy(getattr(self, s)))
         return graph_copy
+
+
+def _unique_edges(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    weights: Optional[np.ndarray],
+    directed: bool,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Индексы первых вхождений различных рёбер в порядке пачки и наименьшие веса
+    повторов каждого из них (None без весов)
+    """
+    if not len(starts):
+        return np.zeros(0, dtype=np.intp), weights
+    try:
+        keys = edge_keys(starts, ends, directed)
+    except ValueError:
+        # ids outside the packable range, number the distinct endpoint pairs instead
+        if not directed:
+            starts, ends = np.minimum(starts, ends), np.maximum(starts, ends)
+        _, keys = np.unique(np.stack([starts, ends], axis=1), axis=0, return_inverse=True)
+        keys = keys.reshape(-1)
+
+    if weights is None:
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        return first, None
+
+    # sorted by key and then weight, the head of every group holds the lightest copy
+    order = np.lexsort((weights, keys))
+    sorted_keys = keys[order]
+    heads = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    lightest = weights[order[heads]]
+    first = np.minimum.reduceat(order, heads)
+    by_position = np.argsort(first)
+    return first[by_position], lightest[by_position]
+
+
+def _new_edges(outgoing: Dict[int, Any], starts: List[int], ends: List[int]) -> List[int]:
+    """Индексы рёбер, которых ещё нет в графе"""
+    ends_of = {}
+    keep = []
+    for i, (_from, _to) in enumerate(zip(starts, ends)):
+        if _from in outgoing:
+            known = ends_of.get(_from)
+            if known is None:
+                known = ends_of[_from] = set(outgoing[_from].keys())
+            if _to in known:
+                continue
+        keep.append(i)
+    return keep
+
+
+def _extend_rows(rows: Dict[int, Any], keys: List[int], items: List[Any]) -> None:
+    """
+    Дописать items в строки rows[keys[i]]: одна сортировка по вершинам, затем каждая
+    строка создаётся из своего отрезка или дополняется им один раз
+
+    Строки и ключи rows ссылаются на те же объекты, что и keys и items, без копий.
+    """
+    key_array = np.asarray(keys, dtype=np.int64)
+    order = np.argsort(key_array, kind="stable")
+    sorted_keys = key_array[order]
+    heads = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    order = order.tolist()
+    items = list(map(items.__getitem__, order))
+    bounds = heads.tolist()
+    vertices = [keys[order[head]] for head in bounds]
+    bounds.append(len(items))
+    factory = rows.default_factory
+    for v, begin, end in zip(vertices, bounds, bounds[1:]):
+        row = rows.get(v)
+        if row is None:
+            rows[v] = factory(items[begin:end])
+        else:
+            row.extend(items[begin:end])
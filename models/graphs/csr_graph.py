@@ -0,0 +1,351 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from models.edges import Edge, WeightedEdge
+from models.graphs.base_graph import BaseGraph, _unique_edges
+
+INDEX_TYPECODE = "q"
+
+
+def _compress(
+    n: int,
+    sources: Sequence[int],
+    targets: Sequence[int],
+    weights: Optional[Sequence[int]] = None,
+) -> Tuple[array, array, Optional[array]]:
+    """Устойчивая сортировка подсчётом списка рёбер в строки CSR"""
+    offsets = array(INDEX_TYPECODE, bytes(8 * (n + 1)))
+    for u in sources:
+        offsets[u + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array(INDEX_TYPECODE, offsets)
+    packed_targets = array(INDEX_TYPECODE, bytes(8 * len(targets)))
+    packed_weights = (
+        array(INDEX_TYPECODE, bytes(8 * len(targets))) if weights is not None else None
+    )
+    for i, u in enumerate(sources):
+        pos = cursor[u]
+        cursor[u] = pos + 1
+        packed_targets[pos] = targets[i]
+        if packed_weights is not None:
+            packed_weights[pos] = weights[i]
+
+    return offsets, packed_targets, packed_weights
+
+
+class _CSRView:
+    """Отображение вершина -> строка CSR-матрицы только для чтения"""
+
+    __slots__ = ("_offsets",)
+
+    def __init__(self, offsets: array):
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        return iter(range(len(self)))
+
+    def __contains__(self, v) -> bool:
+        return 0 <= v < len(self)
+
+    def keys(self) -> range:
+        return range(len(self))
+
+    def _bounds(self, v: int) -> Tuple[int, int]:
+        if v in self:
+            return self._offsets[v], self._offsets[v + 1]
+        return 0, 0
+
+
+class _CSRNeighbors(_CSRView):
+    """Соседи вершины в виде среза непрерывного массива"""
+
+    __slots__ = ("_targets", "_reverse_offsets", "_reverse_targets")
+
+    def __init__(
+        self,
+        offsets: array,
+        targets: array,
+        reverse_offsets: Optional[array] = None,
+        reverse_targets: Optional[array] = None,
+    ):
+        super().__init__(offsets)
+        self._targets = targets
+        self._reverse_offsets = reverse_offsets
+        self._reverse_targets = reverse_targets
+
+    def __getitem__(self, v: int) -> array:
+        start, end = self._bounds(v)
+        row = self._targets[start:end]
+        if self._reverse_offsets is not None and v in self:
+            row += self._reverse_targets[
+                self._reverse_offsets[v] : self._reverse_offsets[v + 1]
+            ]
+        return row
+
+
+class _CSREdges(_CSRView):
+    """Рёбра вершины, создаваемые из строки CSR-матрицы при обращении"""
+
+    __slots__ = ("_targets", "_weights", "_incoming")
+
+    def __init__(
+        self,
+        offsets: array,
+        targets: array,
+        weights: Optional[array],
+        incoming: bool,
+    ):
+        super().__init__(offsets)
+        self._targets = targets
+        self._weights = weights
+        self._incoming = incoming
+
+    def __getitem__(self, v: int) -> List[Union[Edge, WeightedEdge]]:
+        start, end = self._bounds(v)
+        targets = self._targets[start:end]
+        if self._weights is None:
+            if self._incoming:
+                return [Edge(u, v) for u in targets]
+            return [Edge(v, u) for u in targets]
+
+        weights = self._weights[start:end]
+        if self._incoming:
+            return [WeightedEdge(u, v, w) for u, w in zip(targets, weights)]
+        return [WeightedEdge(v, u, w) for u, w in zip(targets, weights)]
+
+
+class CSRGraph(BaseGraph):
+    """
+    Неизменяемый граф в формате CSR (compressed sparse row)
+
+    Вершины перенумерованы в плотный диапазон 0..n-1 в порядке возрастания исходных
+    номеров, смежность хранится в непрерывных массивах смещений, концов и весов рёбер.
+    Интерфейс чтения совпадает с BaseGraph, поэтому алгоритмы работают без изменений,
+    но оперируют плотными номерами вершин (см. original_id и dense_id).
+    """
+
+    __slots__ = (
+        "_labels",
+        "_directed",
+        "_out_offsets",
+        "_out_targets",
+        "_out_weights",
+        "_in_offsets",
+        "_in_sources",
+        "_in_weights",
+    )
+
+    def __init__(
+        self,
+        labels: array,
+        out_offsets: array,
+        out_targets: array,
+        out_weights: Optional[array],
+        in_offsets: array,
+        in_sources: array,
+        in_weights: Optional[array],
+        directed: bool,
+    ):
+        self._labels = labels
+        self._directed = directed
+        self._out_offsets = out_offsets
+        self._out_targets = out_targets
+        self._out_weights = out_weights
+        self._in_offsets = in_offsets
+        self._in_sources = in_sources
+        self._in_weights = in_weights
+
+        self.num_edges = len(out_targets)
+        # immutable, the version never changes
+        self._version = 0
+        self.outgoing_adj_list = _CSREdges(
+            out_offsets, out_targets, out_weights, incoming=False
+        )
+        self.incoming_adj_list = _CSREdges(
+            in_offsets, in_sources, in_weights, incoming=True
+        )
+        if directed:
+            self.neighbors = _CSRNeighbors(
+                out_offsets, out_targets, in_offsets, in_sources
+            )
+        else:
+            self.neighbors = _CSRNeighbors(out_offsets, out_targets)
+
+    @classmethod
+    def from_edges(
+        cls,
+        starts: Iterable[int],
+        ends: Iterable[int],
+        weights: Optional[Iterable[int]] = None,
+        directed: bool = False,
+    ) -> "CSRGraph":
+        """
+        Построить граф из списка рёбер без промежуточного BaseGraph
+
+        :param starts: Начала рёбер
+        :param ends: Концы рёбер
+        :param weights: Веса рёбер, None для невзвешенного графа
+        :param directed: Ориентирован ли граф. Для неориентированного графа каждое ребро
+            хранится в обоих направлениях, как в UndirectedGraph. Повторяющиеся рёбра
+            отбрасываются, как в add_edges: остаётся наименьший вес
+        """
+        starts = array(INDEX_TYPECODE, starts)
+        ends = array(INDEX_TYPECODE, ends)
+        if weights is not None:
+            weights = array(INDEX_TYPECODE, weights)
+        if starts:
+            first, lightest = _unique_edges(
+                np.frombuffer(starts, dtype=np.int64),
+                np.frombuffer(ends, dtype=np.int64),
+                None if weights is None else np.frombuffer(weights, dtype=np.int64),
+                directed,
+            )
+            if len(first) < len(starts):
+                starts, ends = (
+                    array(INDEX_TYPECODE, np.frombuffer(column, dtype=np.int64)[first].tobytes())
+                    for column in (starts, ends)
+                )
+                if weights is not None:
+                    weights = array(INDEX_TYPECODE, lightest.tobytes())
+
+        labels = array(INDEX_TYPECODE, sorted(set(starts).union(ends)))
+        index = {v: i for i, v in enumerate(labels)}
+        sources = array(INDEX_TYPECODE, map(index.__getitem__, starts))
+        targets = array(INDEX_TYPECODE, map(index.__getitem__, ends))
+        del index
+
+        return cls._from_dense_edges(labels, sources, targets, weights, directed)
+
+    @classmethod
+    def from_graph(cls, graph: BaseGraph) -> "CSRGraph":
+        """Построить CSR-представление существующего графа"""
+        labels = array(INDEX_TYPECODE, sorted(graph.get_all_vertices()))
+        index = {v: i for i, v in enumerate(labels)}
+        weighted = graph.is_weighted()
+
+        sources = array(INDEX_TYPECODE)
+        targets = array(INDEX_TYPECODE)
+        weights = array(INDEX_TYPECODE) if weighted else None
+        for v in labels:
+            for edge in graph.outgoing_adj_list[v]:
+                sources.append(index[v])
+                targets.append(index[edge.end])
+                if weighted:
+                    weights.append(edge.weight)
+        del index
+
+        n = len(labels)
+        out_offsets, out_targets, out_weights = _compress(n, sources, targets, weights)
+        if graph.is_directed():
+            in_offsets, in_sources, in_weights = _compress(n, targets, sources, weights)
+        else:
+            in_offsets, in_sources, in_weights = cls._empty_rows(n, weighted)
+
+        return cls(
+            labels,
+            out_offsets,
+            out_targets,
+            out_weights,
+            in_offsets,
+            in_sources,
+            in_weights,
+            graph.is_directed(),
+        )
+
+    @classmethod
+    def _from_dense_edges(
+        cls,
+        labels: array,
+        sources: array,
+        targets: array,
+        weights: Optional[array],
+        directed: bool,
+    ) -> "CSRGraph":
+        n = len(labels)
+        if directed:
+            out_offsets, out_targets, out_weights = _compress(
+                n, sources, targets, weights
+            )
+            in_offsets, in_sources, in_weights = _compress(n, targets, sources, weights)
+        else:
+            out_offsets, out_targets, out_weights = _compress(
+                n,
+                sources + targets,
+                targets + sources,
+                weights + weights if weights is not None else None,
+            )
+            in_offsets, in_sources, in_weights = cls._empty_rows(
+                n, weights is not None
+            )
+
+        return cls(
+            labels,
+            out_offsets,
+            out_targets,
+            out_weights,
+            in_offsets,
+            in_sources,
+            in_weights,
+            directed,
+        )
+
+    @staticmethod
+    def _empty_rows(n: int, weighted: bool) -> Tuple[array, array, Optional[array]]:
+        return (
+            array(INDEX_TYPECODE, bytes(8 * (n + 1))),
+            array(INDEX_TYPECODE),
+            array(INDEX_TYPECODE) if weighted else None,
+        )
+
+    @property
+    def labels(self) -> array:
+        """Исходные номера вершин, индекс в массиве - плотный номер"""
+        return self._labels
+
+    def original_id(self, v: int) -> int:
+        return self._labels[v]
+
+    def dense_id(self, vertex: int) -> int:
+        idx = bisect_left(self._labels, vertex)
+        if idx == len(self._labels) or self._labels[idx] != vertex:
+            raise KeyError(vertex)
+        return idx
+
+    def get_all_vertices(self) -> Set[int]:
+        return set(range(len(self._labels)))
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self._labels)
+
+    def is_weighted(self) -> bool:
+        return self._out_weights is not None
+
+    def is_directed(self) -> bool:
+        return self._directed
+
+    def delete_vertex(self, v: int) -> None:
+        raise TypeError(f"{self.__class__.__name__} is immutable")
+
+    def delete_vertices(self, vertices_to_delete: Iterable[int]) -> None:
+        raise TypeError(f"{self.__class__.__name__} is immutable")
+
+    def delete_edge(self, _from: int, _to: int) -> None:
+        raise TypeError(f"{self.__class__.__name__} is immutable")
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} vertices: {self.num_vertices}; "
+            f"edges: {self.num_edges}; directed: {self._directed}>"
+        )
+
+    def __deepcopy__(self, memodict={}):
+        return self
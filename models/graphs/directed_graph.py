@@ -1,9 +1,15 @@
+from typing import Iterable
+
 from models.graphs.base_graph import BaseGraph
 from models.edges import Edge, WeightedEdge
 
 
 class DirectedGraph(BaseGraph):
     def add_edge(self, _from: int, _to: int) -> None:
+        """Добавить ребро; если оно уже есть, граф не меняется"""
+        if self.has_edge(_from, _to):
+            return
+        self._changed()
         edge = Edge(_from, _to)
         self.outgoing_adj_list[_from].append(edge)
         self.incoming_adj_list[_to].append(edge)
@@ -12,6 +18,10 @@ class DirectedGraph(BaseGraph):
         self.neighbors[_from].append(_to)
         self.neighbors[_to].append(_from)
 
+    def add_edges(self, starts: Iterable[int], ends: Iterable[int]) -> None:
+        """Добавить рёбра пачкой (списками или массивами NumPy), повторы отбрасываются"""
+        self._add_edge_arrays(starts, ends)
+
     def is_weighted(self) -> bool:
         return False
 
@@ -21,6 +31,10 @@ class DirectedGraph(BaseGraph):
 
 class WeightedDirectedGraph(BaseGraph):
     def add_edge(self, _from: int, _to: int, _weight: int) -> None:
+        """Добавить ребро; если оно уже есть, граф не меняется"""
+        if self.has_edge(_from, _to):
+            return
+        self._changed()
         edge = WeightedEdge(_from, _to, _weight)
         self.outgoing_adj_list[_from].append(edge)
         self.incoming_adj_list[_to].append(edge)
@@ -30,6 +44,17 @@ class WeightedDirectedGraph(BaseGraph):
         self.neighbors[_from].append(_to)
         self.neighbors[_to].append(_from)
 
+    def add_edges(
+        self, starts: Iterable[int], ends: Iterable[int], weights: Iterable[int]
+    ) -> None:
+        """
+        Добавить рёбра пачкой (списками или массивами NumPy), повторы отбрасываются
+
+        У ребра, повторяющегося в пачке, остаётся наименьший вес: для кратчайших путей
+        важен только он. Рёбра, которые уже есть в графе, не меняются.
+        """
+        self._add_edge_arrays(starts, ends, weights)
+
     def is_weighted(self) -> bool:
         return True
 
@@ -0,0 +1,120 @@
+import copy
+from typing import AbstractSet, Iterable, List, Set, Union
+
+from models.edges import Edge, WeightedEdge
+from models.graphs.base_graph import BaseGraph
+
+
+class _FilteredView:
+    """Отображение вершина -> смежность родительского графа, ограниченная маской вершин"""
+
+    __slots__ = ("_adjacency", "_vertices")
+
+    def __init__(self, adjacency, vertices: AbstractSet[int]):
+        self._adjacency = adjacency
+        self._vertices = vertices
+
+    def __len__(self) -> int:
+        return len(self._vertices)
+
+    def __iter__(self):
+        return iter(self._vertices)
+
+    def __contains__(self, v) -> bool:
+        return v in self._vertices
+
+    def keys(self) -> AbstractSet[int]:
+        return self._vertices
+
+    def _row(self, v: int):
+        if v not in self._vertices or v not in self._adjacency:
+            return ()
+        return self._adjacency[v]
+
+
+class _FilteredNeighbors(_FilteredView):
+    __slots__ = ()
+
+    def __getitem__(self, v: int) -> List[int]:
+        vertices = self._vertices
+        return [u for u in self._row(v) if u in vertices]
+
+
+class _FilteredEdges(_FilteredView):
+    __slots__ = ("_incoming",)
+
+    def __init__(self, adjacency, vertices: AbstractSet[int], incoming: bool):
+        super().__init__(adjacency, vertices)
+        self._incoming = incoming
+
+    def __getitem__(self, v: int) -> List[Union[Edge, WeightedEdge]]:
+        vertices = self._vertices
+        if self._incoming:
+            return [e for e in self._row(v) if e.start in vertices]
+        return [e for e in self._row(v) if e.end in vertices]
+
+
+class SubgraphView(BaseGraph):
+    """
+    Подграф на заданном множестве вершин без копирования смежности
+
+    Хранит ссылку на родительский граф и множество вершин подграфа, соседи и рёбра
+    фильтруются при обращении. Изменения родительского графа видны через представление.
+    """
+
+    __slots__ = ("_parent", "_vertices")
+
+    def __init__(self, parent: BaseGraph, vertices: AbstractSet[int]):
+        self._parent = parent
+        self._vertices = vertices
+        self.outgoing_adj_list = _FilteredEdges(
+            parent.outgoing_adj_list, vertices, incoming=False
+        )
+        self.incoming_adj_list = _FilteredEdges(
+            parent.incoming_adj_list, vertices, incoming=True
+        )
+        self.neighbors = _FilteredNeighbors(parent.neighbors, vertices)
+
+    @property
+    def parent(self) -> BaseGraph:
+        return self._parent
+
+    @property
+    def version(self) -> int:
+        # the view changes together with its parent
+        return self._parent.version
+
+    @property
+    def num_edges(self) -> int:
+        return sum(len(self.outgoing_adj_list[v]) for v in self._vertices)
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self._vertices)
+
+    def get_all_vertices(self) -> Set[int]:
+        return set(self._vertices)
+
+    def is_weighted(self) -> bool:
+        return self._parent.is_weighted()
+
+    def is_directed(self) -> bool:
+        return self._parent.is_directed()
+
+    def delete_vertex(self, v: int) -> None:
+        raise TypeError(f"{self.__class__.__name__} is read-only")
+
+    def delete_vertices(self, vertices_to_delete: Iterable[int]) -> None:
+        raise TypeError(f"{self.__class__.__name__} is read-only")
+
+    def delete_edge(self, _from: int, _to: int) -> None:
+        raise TypeError(f"{self.__class__.__name__} is read-only")
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} vertices: {self.num_vertices}; "
+            f"parent: {self._parent.__class__.__name__}>"
+        )
+
+    def __deepcopy__(self, memodict={}):
+        return SubgraphView(copy.deepcopy(self._parent), set(self._vertices))
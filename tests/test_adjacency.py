@@ -0,0 +1,48 @@
+import copy
+import pickle
+import random
+
+from models.graphs.adjacency import AdjacencyRow
+
+
+def test_row_matches_list_model():
+    rng = random.Random(1)
+    for _ in range(100):
+        row, model = AdjacencyRow(), []
+        for _ in range(200):
+            op = rng.random()
+            if op < 0.4:
+                x = rng.randrange(30)
+                row.append(x)
+                model.append(x)
+            elif op < 0.55:
+                xs = [rng.randrange(30) for _ in range(rng.randrange(5))]
+                row.extend(xs)
+                model.extend(xs)
+            elif op < 0.8 and model:
+                key = rng.choice(model)
+                assert row.remove_key(key) == key
+                model.remove(key)
+            else:
+                key = rng.randrange(30)
+                assert row.count(key) == model.count(key)
+                assert (key in row) == (key in model)
+            assert sorted(row) == sorted(model)
+
+
+def test_index_is_built_only_when_needed():
+    row = AdjacencyRow(range(100))
+    row.extend(range(100, 200))
+    assert getattr(row, "_positions", None) is None
+    assert 5 in row
+    assert row._positions is not None
+
+
+def test_copies_rebuild_the_index():
+    row = AdjacencyRow([1, 2, 2, 3])
+    row.remove_key(1)
+    clone = copy.deepcopy(row)
+    assert type(clone) is AdjacencyRow and clone == row
+    clone.remove_key(2)
+    assert sorted(clone) == [2, 3] and sorted(row) == [2, 2, 3]
+    assert pickle.loads(pickle.dumps(row)).count(2) == 2
@@ -0,0 +1,37 @@
+import math
+import random
+
+import pytest
+
+from algoritms.landmarks import LandmarksBasic, LandmarksLCA
+from algoritms.landmarks.utils import SelectLandmarksMethod
+from algoritms.shortest_paths import dijkstra
+from models import UndirectedGraph, UndirectedWeightedGraph
+
+
+def random_graph(rng, weighted):
+    # two random parts without edges between them, so some pairs are unreachable
+    graph = UndirectedWeightedGraph() if weighted else UndirectedGraph()
+    n = rng.randrange(6, 40)
+    for _ in range(2 * n):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v and (u % 3 == 0) == (v % 3 == 0):
+            graph.add_edge(u, v, rng.randint(1, 9)) if weighted else graph.add_edge(u, v)
+    return graph
+
+
+@pytest.mark.parametrize("cls", [LandmarksBasic, LandmarksLCA])
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("bidirectional", [False, True])
+def test_exact_distance_matches_dijkstra(cls, weighted, bidirectional):
+    rng = random.Random(9)
+    random.seed(9)
+    for _ in range(15):
+        graph = random_graph(rng, weighted)
+        vertices = sorted(graph.get_all_vertices())
+        oracle = cls(graph, 2, SelectLandmarksMethod.RANDOM)
+        for s in vertices:
+            lengths = dijkstra(graph, s)
+            for t in vertices:
+                result = oracle.exact_distance(s, t, bidirectional=bidirectional)
+                assert result.distance == lengths.get(t, math.inf), (s, t)
@@ -0,0 +1,28 @@
+import pytest
+
+from algoritms.components import condensation, strong_components, weak_components
+from algoritms.utils import max_weak_conns_num, weak_conns
+from models import DirectedGraph, UndirectedGraph
+
+
+def test_cached_components_cannot_be_mutated():
+    graph = UndirectedGraph()
+    graph.add_edges([1, 2, 4], [2, 3, 5])
+    components = weak_components(graph)
+    with pytest.raises(AttributeError):
+        components.sizes.append(999)
+    with pytest.raises(AttributeError):
+        components.members[0].add(42)
+
+    weak_conns(graph)[0].add(42)
+    assert max_weak_conns_num(graph) == 3
+    assert weak_components(graph).members == (frozenset({1, 2, 3}), frozenset({4, 5}))
+
+
+def test_strong_components_and_condensation_are_immutable():
+    graph = DirectedGraph()
+    graph.add_edges([1, 2, 2], [2, 1, 3])
+    components = strong_components(graph)
+    assert components.members == (frozenset({1, 2}), frozenset({3}))
+    assert components.sizes == (2, 1)
+    assert condensation(graph) == (frozenset({1}), frozenset())
@@ -0,0 +1,57 @@
+import random
+
+from algoritms.shortest_paths import dijkstra
+from algoritms.utils import bounding_eccentricities, weak_conns
+from models import UndirectedGraph, UndirectedWeightedGraph
+
+
+def random_graph(rng, weighted):
+    graph = UndirectedWeightedGraph() if weighted else UndirectedGraph()
+    n = rng.randrange(3, 40)
+    for v in range(1, n):
+        # a random tree keeps the graph connected, extra edges add cycles
+        u = rng.randrange(v)
+        graph.add_edge(u, v, rng.randint(1, 9)) if weighted else graph.add_edge(u, v)
+    for _ in range(rng.randrange(n)):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            graph.add_edge(u, v, rng.randint(1, 9)) if weighted else graph.add_edge(u, v)
+    return graph
+
+
+def brute_force(graph, q):
+    vertices = max(weak_conns(graph), key=len)
+    ecc = sorted(max(dijkstra(graph, v).values()) for v in vertices)
+    return vertices, ecc[0], ecc[-1], ecc[int(len(ecc) * q)]
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    for weighted in (False, True):
+        for _ in range(60):
+            graph = random_graph(rng, weighted)
+            vertices, radius, diameter, percentile = brute_force(graph, 0.9)
+            result = bounding_eccentricities(
+                graph, vertices, 0.9, max_percentile_runs=len(vertices)
+            )
+            assert result.percentile_exact
+            assert (result.radius, result.diameter, result.percentile) == (
+                radius,
+                diameter,
+                percentile,
+            )
+
+
+def test_percentile_falls_back_to_sampling_after_the_cap():
+    rng = random.Random(3)
+    for weighted in (False, True):
+        for _ in range(30):
+            graph = random_graph(rng, weighted)
+            vertices, radius, diameter, percentile = brute_force(graph, 0.9)
+            # the sample covers the whole component, so the estimate is exact too
+            result = bounding_eccentricities(graph, vertices, 0.9, max_percentile_runs=0)
+            assert (result.radius, result.diameter, result.percentile) == (
+                radius,
+                diameter,
+                percentile,
+            )
@@ -0,0 +1,40 @@
+import random
+
+from models import CSRGraph, DirectedGraph, UndirectedGraph, UndirectedWeightedGraph
+
+
+def rows(graph):
+    outgoing = graph.outgoing_adj_list
+    return {
+        v: sorted((e.start, e.end, getattr(e, "weight", 1)) for e in outgoing[v])
+        for v in outgoing
+    }
+
+
+def test_bulk_insert_matches_single_inserts():
+    rng = random.Random(0)
+    for cls in (DirectedGraph, UndirectedGraph):
+        starts = [rng.randrange(30) for _ in range(200)]
+        ends = [rng.randrange(30) for _ in range(200)]
+        bulk, single = cls(), cls()
+        bulk.add_edges(starts[:100], ends[:100])
+        bulk.add_edges(starts[100:], ends[100:])
+        for s, t in zip(starts, ends):
+            single.add_edge(s, t)
+        assert rows(bulk) == rows(single)
+        assert bulk.num_edges == single.num_edges
+        assert {v: sorted(bulk.neighbors[v]) for v in bulk.neighbors} == {
+            v: sorted(single.neighbors[v]) for v in single.neighbors
+        }
+
+
+def test_duplicate_in_batch_keeps_lightest_weight():
+    graph = UndirectedWeightedGraph()
+    graph.add_edges([1, 2, 1], [2, 1, 2], [5, 3, 4])
+    assert rows(graph) == {1: [(1, 2, 3)], 2: [(2, 1, 3)]}
+
+    graph.add_edges([1], [2], [1])
+    assert rows(graph) == {1: [(1, 2, 3)], 2: [(2, 1, 3)]}
+
+    csr = CSRGraph.from_edges([1, 2, 1], [2, 1, 2], [5, 3, 4])
+    assert [e.weight for e in csr.outgoing_adj_list[1]] == [3]
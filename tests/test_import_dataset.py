@@ -0,0 +1,35 @@
+import pytest
+
+from import_dataset import iter_edge_chunks
+
+
+def read(path, **kwargs):
+    chunks = iter_edge_chunks(str(path), **kwargs)
+    return [[column.tolist() for column in chunk] for chunk in chunks]
+
+
+def test_line_with_wrong_field_count_is_rejected(tmp_path):
+    path = tmp_path / "edges.txt"
+    path.write_text("1 2\n3 4 9\n5 6\n7 8\n")
+    with pytest.raises(ValueError, match=":2: expected 2 fields, got 3"):
+        read(path)
+    assert not (tmp_path / "edges.txt.edgecache").exists()
+
+
+def test_cache_is_not_reused_with_other_parse_settings(tmp_path):
+    path = tmp_path / "edges.csv"
+    path.write_text("1,2,3,4\n5,6,7,8\n")
+    assert read(path, fields=4, columns=3) == [[[1, 5], [2, 6], [3, 7]]]
+    assert read(path, fields=4, columns=3) == [[[1, 5], [2, 6], [3, 7]]]
+    assert read(path, fields=4, columns=3, skip_header=True) == [[[5], [6], [7]]]
+
+
+def test_trailing_empty_fields_are_accepted(tmp_path):
+    path = tmp_path / "vk.csv"
+    path.write_text("u,v,t,h\n1,2,3,4\n5,6,7,\n")
+    edges = read(path, fields=4, columns=3, skip_header=True)
+    assert edges == [[[1, 5], [2, 6], [3, 7]]]
+
+    path.write_text("u,v,t,h\n1,2,3,4\n5,6,,\n")
+    with pytest.raises(ValueError, match=":3: expected 4 fields, got 2"):
+        read(path, fields=4, columns=3, skip_header=True, use_cache=False)
@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+import pytest
+
+from algoritms.landmarks import LandmarksBasic, LandmarksLCA
+from algoritms.landmarks.utils import SelectLandmarksMethod
+from algoritms.shortest_paths import dijkstra
+from models import UndirectedGraph, UndirectedWeightedGraph
+
+
+def random_graph(rng, weighted):
+    graph = UndirectedWeightedGraph() if weighted else UndirectedGraph()
+    n = rng.randrange(5, 30)
+    for v in range(1, n):
+        u = rng.randrange(v)
+        graph.add_edge(u, v, rng.randint(1, 9)) if weighted else graph.add_edge(u, v)
+    for _ in range(rng.randrange(n)):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            graph.add_edge(u, v, rng.randint(1, 9)) if weighted else graph.add_edge(u, v)
+    return graph
+
+
+def rebuild(cls, graph, landmarks, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda _: " ".join(map(str, landmarks)))
+    return cls(graph, len(landmarks), SelectLandmarksMethod.MANUAL)
+
+
+def mutate(rng, oracle, graph):
+    """Случайное добавление или удаление ребра через оракул"""
+    n = max(graph.get_all_vertices()) + 1
+    if rng.random() < 0.5:
+        # new vertices come with the edges
+        u, v = rng.randrange(n + 2), rng.randrange(n + 2)
+        if u != v:
+            oracle.add_edge(u, v, rng.randint(1, 9))
+        return
+    # keep every vertex in the graph, a rebuild needs the same landmarks and columns
+    edges = [
+        (e.start, e.end)
+        for e in graph.get_all_edges()
+        if len(graph.neighbors[e.start]) > 1 and len(graph.neighbors[e.end]) > 1
+    ]
+    if edges:
+        oracle.delete_edge(*rng.choice(edges))
+
+
+@pytest.mark.parametrize("cls", [LandmarksBasic, LandmarksLCA])
+@pytest.mark.parametrize("weighted", [False, True])
+def test_updates_match_rebuild(cls, weighted, monkeypatch):
+    rng = random.Random(11)
+    random.seed(11)
+    for _ in range(15):
+        graph = random_graph(rng, weighted)
+        oracle = cls(graph, 3, SelectLandmarksMethod.RANDOM)
+        landmarks = list(oracle._landmarks)
+        for _ in range(8):
+            mutate(rng, oracle, graph)
+            fresh = rebuild(cls, graph, landmarks, monkeypatch)
+
+            vertices = sorted(graph.get_all_vertices())
+            pairs = [(s, t) for s in vertices for t in vertices]
+            upper, lower = oracle.distance_many(pairs)
+            fresh_upper, fresh_lower = fresh.distance_many(pairs)
+            lengths = {s: dijkstra(graph, s) for s in vertices}
+            exact = [lengths[s].get(t, np.inf) for s, t in pairs]
+
+            assert lower.tolist() == fresh_lower.tolist()
+            assert np.all(lower <= exact) and np.all(upper >= exact)
+            if cls is LandmarksBasic:
+                assert upper.tolist() == fresh_upper.tolist()
+            # a landmark row is exact, both through the table and through its tree
+            for landmark in landmarks:
+                for v in vertices:
+                    assert oracle.distance(landmark, v) == lengths[landmark].get(v, np.inf)
@@ -0,0 +1,57 @@
+import math
+import random
+
+import pytest
+
+from algoritms.landmarks import PrunedLandmarkLabeling
+from algoritms.shortest_paths import dijkstra
+from algoritms.utils import get_shortest_path_lengths
+from models import DirectedGraph, UndirectedGraph, UndirectedWeightedGraph
+
+
+def random_graph(rng, cls):
+    # two random parts without edges between them, so some pairs are unreachable
+    graph = cls()
+    weighted = graph.is_weighted()
+    n = rng.randrange(6, 40)
+    for _ in range(2 * n):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v and u % 2 == v % 2:
+            graph.add_edge(u, v, rng.randint(1, 9)) if weighted else graph.add_edge(u, v)
+    return graph
+
+
+@pytest.mark.parametrize("cls", [UndirectedGraph, DirectedGraph, UndirectedWeightedGraph])
+def test_matches_brute_force(cls):
+    rng = random.Random(5)
+    for _ in range(20):
+        graph = random_graph(rng, cls)
+        vertices = sorted(graph.get_all_vertices())
+        oracle = PrunedLandmarkLabeling(graph)
+        pairs = [(s, t) for s in vertices for t in vertices]
+        expected = []
+        for s in vertices:
+            # BFS for unweighted graphs, Dijkstra for weighted ones
+            lengths = get_shortest_path_lengths(graph, s, vertices)
+            assert lengths == {t: dijkstra(graph, s).get(t, math.inf) for t in vertices}
+            expected += [lengths[t] for t in vertices]
+
+        assert [oracle.distance(s, t) for s, t in pairs] == expected
+        assert oracle.distance_many(pairs).tolist() == expected
+
+
+def test_loaded_labels_answer_the_same(tmp_path):
+    rng = random.Random(3)
+    graph = random_graph(rng, UndirectedWeightedGraph)
+    vertices = sorted(graph.get_all_vertices())
+    pairs = [(s, t) for s in vertices for t in vertices]
+    oracle = PrunedLandmarkLabeling(graph)
+    path = str(tmp_path / "pll.idx")
+    oracle.save(path)
+
+    loaded = PrunedLandmarkLabeling.load(path, graph)
+    assert loaded.distance_many(pairs).tolist() == oracle.distance_many(pairs).tolist()
+
+    graph.add_edge(vertices[0], vertices[-1], 1)
+    with pytest.raises(ValueError):
+        PrunedLandmarkLabeling.load(path, graph)
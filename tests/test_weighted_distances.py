@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+
+from algoritms.landmarks import LandmarksBasic, LandmarksLCA
+from algoritms.landmarks.utils import SelectLandmarksMethod
+from algoritms.utils import evaluate_main_characteristics, get_shortest_path_lengths_batch
+from models import UndirectedWeightedGraph
+
+
+def heavy_path() -> UndirectedWeightedGraph:
+    graph = UndirectedWeightedGraph()
+    graph.add_edge(1, 2, 40000)
+    graph.add_edge(2, 3, 40000)
+    return graph
+
+
+def test_heavy_weighted_path_does_not_overflow():
+    graph = heavy_path()
+    assert evaluate_main_characteristics(graph, [1, 2, 3]) == (40000, 80000, 80000)
+
+
+def test_batch_dtype_follows_weights():
+    graph = heavy_path()
+    distances = get_shortest_path_lengths_batch(graph, [1], [1, 2, 3])
+    assert distances.dtype == np.uint32
+    assert distances.tolist() == [[0, 40000, 80000]]
+
+    graph.add_edge(3, 4, 0.5)
+    distances = get_shortest_path_lengths_batch(graph, [1], [1, 2, 3, 4, 5])
+    assert distances.dtype == np.float64
+    assert distances[0, :4].tolist() == [0, 40000, 80000, 80000.5]
+    assert distances[0, 4] == math.inf
+
+
+def test_landmarks_on_fractional_weights():
+    graph = heavy_path()
+    graph.add_edge(3, 4, 0.5)
+    oracle = LandmarksBasic(graph, 1, SelectLandmarksMethod.RANDOM)
+    assert oracle.exact_distance(1, 4).distance == 80000.5
+
+
+def test_exact_characteristics_on_weighted_star():
+    # the pendant shortcut would give every leaf the centre's eccentricity plus 1
+    graph = UndirectedWeightedGraph()
+    graph.add_edge(0, 1, 10)
+    graph.add_edge(0, 2, 5)
+    graph.add_edge(0, 3, 1)
+    radius, diameter, percentile, _ = evaluate_main_characteristics(
+        graph, [0, 1, 2, 3], exact=True
+    )
+    assert (radius, diameter, percentile) == (10, 15, 15)
+
+
+def test_landmark_upper_bound_keeps_fractional_distance():
+    graph = UndirectedWeightedGraph()
+    graph.add_edge(1, 2, 0.5)
+    graph.add_edge(2, 3, 0.75)
+    for cls in (LandmarksBasic, LandmarksLCA):
+        oracle = cls(graph, 1, SelectLandmarksMethod.RANDOM)
+        assert oracle.distance(1, 3) >= 1.25
+
+
+def test_sampled_characteristics_keep_fractional_eccentricities():
+    graph = UndirectedWeightedGraph()
+    graph.add_edge(1, 2, 0.5)
+    graph.add_edge(2, 3, 0.75)
+    assert evaluate_main_characteristics(graph, [1, 2, 3]) == (0.75, 1.25, 1.25)